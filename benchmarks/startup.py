@@ -0,0 +1,60 @@
+"""Measure `okn-search` cold-start cost, with and without a text embed.
+
+Each sample runs in a fresh interpreter, as a CLI invocation or a gunicorn
+worker boot would: import the package, build the `AppContext` from the
+environment, and optionally embed one text. Building the context opens no
+Qdrant connection, so no server is needed.
+
+    uv run python benchmarks/startup.py --runs 5
+
+"context" is what `list-graphs` and node searches pay before their first
+Qdrant call; "context + embed" is what a text search pays.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+SNIPPETS = {
+    "import": "import okn_embeddings.cli.main",
+    "context": (
+        "import okn_embeddings.cli.main\n"
+        "from okn_embeddings.config import AppContext\n"
+        "AppContext.from_env()"
+    ),
+    "context + embed": (
+        "import okn_embeddings.cli.main\n"
+        "from okn_embeddings.config import AppContext\n"
+        "AppContext.from_env().embedder.embed('diabetes')"
+    ),
+}
+
+
+def time_snippet(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # Warm the OS page cache and the model download cache first, so every
+    # sample measures the same thing.
+    time_snippet(SNIPPETS["context + embed"])
+
+    for name, code in SNIPPETS.items():
+        samples = [time_snippet(code) for _ in range(args.runs)]
+        print(
+            f"{name:>16}: median {statistics.median(samples):.3f}s "
+            f"(min {min(samples):.3f}s, max {max(samples):.3f}s, "
+            f"n={args.runs})"
+        )
+
+
+if __name__ == "__main__":
+    main()
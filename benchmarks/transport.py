@@ -0,0 +1,99 @@
+"""Compare Qdrant REST and gRPC for bulk upserts and single queries.
+
+Needs a running Qdrant that exposes both ports, e.g.
+
+    docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant
+    uv run python benchmarks/transport.py --location http://127.0.0.1:6333
+
+Random unit vectors stand in for embeddings, so no model is loaded and the
+numbers are transport and server cost only. Each transport gets a scratch
+collection of its own, deleted afterwards. Upserts go in batches the way
+`okn-indexing upload` sends them (`PointStruct`s built from one float-list
+conversion per batch); queries pass the numpy vector, as the search path
+does.
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+
+def make_points(vectors: np.ndarray, start: int) -> list[PointStruct]:
+    return [
+        PointStruct(id=start + i, vector=row, payload={"graph": "bench"})
+        for i, row in enumerate(vectors.tolist())
+    ]
+
+
+def bench(client: QdrantClient, vectors: np.ndarray, args) -> dict[str, float]:
+    collection = f"transport-bench-{uuid.uuid4().hex[:8]}"
+    client.create_collection(
+        collection,
+        vectors_config=VectorParams(
+            size=vectors.shape[1], distance=Distance.COSINE
+        ),
+    )
+    try:
+        start = time.perf_counter()
+        for i in range(0, len(vectors), args.batch):
+            client.upsert(
+                collection,
+                points=make_points(vectors[i : i + args.batch], i),
+                wait=True,
+            )
+        upsert_seconds = time.perf_counter() - start
+
+        rng = np.random.default_rng(1)
+        latencies = []
+        for _ in range(args.queries):
+            query = rng.standard_normal(vectors.shape[1]).astype(np.float32)
+            start = time.perf_counter()
+            client.query_points(collection, query=query, limit=args.limit)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        client.delete_collection(collection)
+
+    return {
+        "points/s": len(vectors) / upsert_seconds,
+        "query p50 ms": statistics.median(latencies) * 1000,
+        "query p95 ms": np.percentile(latencies, 95) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--location", default="http://127.0.0.1:6333")
+    parser.add_argument("--grpc-port", type=int, default=6334)
+    parser.add_argument("--points", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = np.random.default_rng(0).standard_normal(
+        (args.points, args.dim), dtype=np.float32
+    )
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    for name, prefer_grpc in (("rest", False), ("grpc", True)):
+        client = QdrantClient(
+            location=args.location,
+            prefer_grpc=prefer_grpc,
+            grpc_port=args.grpc_port,
+        )
+        results = bench(client, vectors, args)
+        client.close()
+        print(
+            f"{name:>4}: "
+            + ", ".join(f"{key} {value:,.1f}" for key, value in results.items())
+        )
+
+
+if __name__ == "__main__":
+    main()
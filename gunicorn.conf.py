@@ -1,6 +1,41 @@
 import os
 
 workers = int(os.getenv("NUM_WORKERS", "4"))
+threads = int(os.getenv("NUM_THREADS", "1"))
 host = os.getenv("HOST", "0.0.0.0")
 port = os.getenv("PORT", "8000")
 bind = f"{host}:{port}"
+
+# Preload mode builds the app once in the master, loads the embedding model
+# there, and forks the workers from it, so they share the model's memory
+# copy-on-write instead of each loading their own. The Qdrant client is not
+# fork-safe, so each worker opens its own after the fork. A test in
+# tests/test_query.py checks that the inherited embedding session still works
+# in a forked child.
+preload_app = os.getenv("PRELOAD_APP", "0") == "1"
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+
+    import gc
+
+    from okn_embeddings.web.app import app
+
+    # embed_many bypasses the query cache, so this loads the model without
+    # leaving an entry behind.
+    app.ctx.embedder.embed_many(["warm up"])
+
+    # Move everything allocated so far out of the collector's reach, so its
+    # passes in the workers do not write to (and so copy) the shared pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+
+    from okn_embeddings.web.app import app
+
+    app.ctx.reconnect()
@@ -1,5 +1,6 @@
 import json
 from enum import Enum
+from itertools import batched
 from typing import Annotated, NoReturn
 
 import typer
@@ -8,10 +9,11 @@ from rich.console import Console
 from rich.table import Table
 
 from ..config import AppContext
+from ..core.batch import run_batch_search
 from ..core.errors import friendly_error
 from ..core.explore import GraphSurveyResult, run_survey
 from ..core.graphs import get_graph_facets
-from ..core.models import build_feature, build_query
+from ..core.models import NodeFeature, Query, build_feature, build_query
 from ..core.query import run_similarity_search
 from ..core.results import ResultRow, summarize_point
 
@@ -300,6 +302,97 @@ def survey(
         _print_survey_table(results, show_repr)
 
 
+@app.command("similar-batch")
+def similar_batch(
+    iris_file: Annotated[
+        typer.FileText,
+        typer.Argument(
+            help="File of node IRIs, one per line ('-' or omitted = stdin).",
+        ),
+    ] = "-",
+    graph: Annotated[
+        list[str] | None,
+        typer.Option(
+            "--graph",
+            "-g",
+            help="Restrict search to these graphs (repeatable).",
+        ),
+    ] = None,
+    exclude_graph: Annotated[
+        list[str] | None,
+        typer.Option(
+            "--exclude-graph",
+            "-x",
+            help="Exclude these graphs (repeatable).",
+        ),
+    ] = None,
+    limit: Annotated[
+        int,
+        typer.Option("--limit", "-l", min=1, help="Maximum results per IRI."),
+    ] = 10,
+    chunk_size: Annotated[
+        int,
+        typer.Option(
+            "--chunk-size",
+            min=1,
+            max=1000,
+            help="IRIs resolved and searched per batched request.",
+        ),
+    ] = 256,
+    exact: Annotated[
+        bool,
+        typer.Option("--exact", help="Exact (kNN) search instead of ANN."),
+    ] = False,
+    show_repr: Annotated[
+        bool,
+        typer.Option(
+            "--show-repr",
+            help="Include each result's embedding text.",
+        ),
+    ] = False,
+):
+    """Find similar nodes for many IRIs, writing one JSON line per IRI.
+
+    IRIs are resolved and searched a chunk at a time, in one batched request
+    each, so throughput does not pay a model load or connection per IRI.
+    Lines are {"iri", "results"}, or {"iri", "error"} for an unknown IRI.
+    """
+    if graph and exclude_graph:
+        raise typer.BadParameter("Use only one of --graph / --exclude-graph.")
+
+    ctx = AppContext.from_env()
+
+    iris = (line.strip() for line in iris_file)
+    for chunk in batched((iri for iri in iris if iri), chunk_size):
+        queries = [
+            Query(
+                feature=NodeFeature(type="node", value=iri),
+                include_graphs=graph or None,
+                exclude_graphs=exclude_graph or None,
+                limit=limit,
+            )
+            for iri in chunk
+        ]
+
+        try:
+            results = run_batch_search(ctx, queries, exact=exact)
+        except Exception as e:
+            _fail(friendly_error(e))
+
+        for iri, result in zip(chunk, results, strict=True):
+            if isinstance(result, Exception):
+                line = {"iri": iri, "error": str(result)}
+            else:
+                line = {
+                    "iri": iri,
+                    "results": [
+                        _row_to_dict(summarize_point(p), show_repr)
+                        for p in result.points
+                    ],
+                }
+            typer.echo(json.dumps(line))
+
+
 @app.command("list-graphs")
 def list_graphs(
     sort: Annotated[
@@ -1,5 +1,6 @@
-from .context import AppContext
+from .context import AppContext, AsyncAppContext
 
 __all__ = [
     "AppContext",
+    "AsyncAppContext",
 ]
@@ -1,17 +1,29 @@
 from dataclasses import dataclass
 
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 
-from ..core.embedding import Embedder, make_embedder
+from ..core.embedding import Embedder, make_query_embedder
 from ..core.graphs import get_graphs
+from ..core.result_cache import ResultCache, make_result_cache
 from .settings import AppSettings, load_settings
 
 
+def make_client(settings: AppSettings) -> QdrantClient:
+    return QdrantClient(
+        location=settings.qdrant_location,
+        timeout=settings.qdrant_timeout,
+        prefer_grpc=settings.qdrant_prefer_grpc,
+        grpc_port=settings.qdrant_grpc_port,
+    )
+
+
 @dataclass
 class AppContext:
     client: QdrantClient
     embedder: Embedder
     settings: AppSettings
+    # Whole-response cache for `run_similarity_search`; None disables it.
+    result_cache: ResultCache | None = None
 
     @staticmethod
     def from_env() -> "AppContext":
@@ -19,18 +31,60 @@ class AppContext:
 
     @staticmethod
     def from_settings(settings: AppSettings) -> "AppContext":
-        client = QdrantClient(
-            location=settings.qdrant_location,
-            timeout=settings.qdrant_timeout,
-        )
-        embedder = make_embedder(settings)
+        embedder = make_query_embedder(settings)
 
         return AppContext(
-            client=client,
+            client=make_client(settings),
             embedder=embedder,
             settings=settings,
+            result_cache=make_result_cache(settings),
         )
 
+    def reconnect(self) -> None:
+        """Replace the Qdrant client with a new one.
+
+        The client's connection pool cannot be shared across a fork, so a
+        context built before gunicorn forks (preload mode) calls this in each
+        worker. The embedder, which is read-only, is kept and shared.
+        """
+        self.client = make_client(self.settings)
+
     @property
     def graphs(self) -> list[str]:
         return get_graphs(self)
+
+
+@dataclass
+class AsyncAppContext:
+    """`AppContext` for the asyncio query path (see `core.aio`).
+
+    Qdrant calls are awaited, so one process can keep many searches in
+    flight. The embedder is the same synchronous one; `core.aio` runs it in a
+    worker thread so it does not block the event loop.
+    """
+
+    client: AsyncQdrantClient
+    embedder: Embedder
+    settings: AppSettings
+    result_cache: ResultCache | None = None
+
+    @staticmethod
+    def from_env() -> "AsyncAppContext":
+        return AsyncAppContext.from_settings(load_settings())
+
+    @staticmethod
+    def from_settings(settings: AppSettings) -> "AsyncAppContext":
+        client = AsyncQdrantClient(
+            location=settings.qdrant_location,
+            timeout=settings.qdrant_timeout,
+            prefer_grpc=settings.qdrant_prefer_grpc,
+            grpc_port=settings.qdrant_grpc_port,
+        )
+        embedder = make_query_embedder(settings)
+
+        return AsyncAppContext(
+            client=client,
+            embedder=embedder,
+            settings=settings,
+            result_cache=make_result_cache(settings),
+        )
@@ -24,6 +24,11 @@ class AppSettings(BaseSettings):
     qdrant_hnsw_ef: int = 500
     qdrant_collection: str = "OKN-Graph"
     qdrant_timeout: int = 30
+    # gRPC sends vectors as packed protobuf floats rather than JSON number
+    # lists, which is cheaper to encode on both ends. REST stays the default
+    # since it is what every deployment already exposes.
+    qdrant_prefer_grpc: bool = False
+    qdrant_grpc_port: int = 6334
     model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
 
     # Embedding throughput knobs, both unset by default because onnxruntime's
@@ -44,6 +49,30 @@ class AppSettings(BaseSettings):
     embed_threads: int | None = None
     embed_parallel: int | None = None
 
+    # Entries in the LRU cache in front of query-text embedding (see
+    # `CachedEmbedder`). A MiniLM vector is 1.5 KB, so the default costs about
+    # 6 MB per process. 0 disables the cache.
+    query_cache_size: int = 4096
+
+    # Micro-batching of concurrent query embeddings (see `BatchingEmbedder`).
+    # Only pays off when a process serves requests concurrently, i.e. gunicorn
+    # with NUM_THREADS > 1; with one request at a time every call would just
+    # wait out the window alone. 0 disables.
+    embed_batch_wait_ms: float = 0
+    embed_batch_max_size: int = 32
+
+    # Whole-response cache for similarity searches (see `ResultCache`):
+    # approximate memory budget per process, and how long an entry lives.
+    # Entries are also dropped when the collection changes. 0 MB disables.
+    result_cache_mb: int = 64
+    result_cache_ttl: int = 60 * 10
+
+    # Pages past the first are sliced from one cached ranking per query,
+    # grown this many results at a time (see `candidates_end`), so paging
+    # deeper fetches only the results not seen yet. Needs the result cache;
+    # 0 fetches every page as is.
+    page_window: int = 100
+
 
 def load_settings():
     return AppSettings()
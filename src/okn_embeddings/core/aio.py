@@ -0,0 +1,316 @@
+"""Asyncio versions of the query entry points, over `AsyncAppContext`.
+
+Each mirrors its synchronous namesake in `query`, `explore` and `graphs` and
+shares its request building, result shaping and caches, so both paths return
+the same results and warm the same lookups. Only the Qdrant calls differ: they
+are awaited, so a slow response holds up one task rather than a whole worker.
+Embedding is CPU-bound and synchronous, so it runs in a worker thread.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+from loguru import logger
+
+from ..config import AsyncAppContext
+from . import graphs, query, result_cache
+from .batch import (
+    BatchResult,
+    batch_inputs,
+    cache_nodes,
+    cached_nodes,
+    collect_nodes,
+    iris_filter,
+    plan_batch,
+)
+from .explore import (
+    GraphSurveyResult,
+    rank_survey,
+    resolve_target_graphs,
+    survey_requests,
+)
+from .graphs import GraphFacet, facets_from_response
+from .models import (
+    Feature,
+    NodeFeature,
+    Query,
+    TextFeature,
+    TimedQueryResponse,
+)
+from .query import (
+    NodePoint,
+    build_graph_filter,
+    iri_filter,
+    make_search_params,
+    node_from_points,
+    node_point_id,
+)
+from .result_cache import (
+    CollectionVersion,
+    candidates_end,
+    candidates_key,
+    extend_candidates,
+    missing_candidates,
+    result_key,
+    slice_page,
+    version_from_info,
+)
+
+
+async def lookup_node(ctx: AsyncAppContext, iri: str) -> NodePoint:
+    """`query.lookup_node`, reading and filling the same cache."""
+    cached = query.lookup_node
+    key = cached.cache_key(ctx, iri)
+    node = cached.lookup(key)
+    if node is not None:
+        return node
+
+    points, _ = await ctx.client.scroll(
+        collection_name=ctx.settings.qdrant_collection,
+        scroll_filter=iri_filter(iri),
+        limit=1,
+        with_vectors=True,
+    )
+    node = node_from_points(iri, points)
+
+    cached.store(key, node)
+    return node
+
+
+async def get_embedding(
+    ctx: AsyncAppContext,
+    feature: Feature,
+) -> np.ndarray:
+    match feature:
+        case TextFeature(type="text"):
+            return await asyncio.to_thread(ctx.embedder.embed, feature.value)
+        case NodeFeature(type="node"):
+            return (await lookup_node(ctx, feature.value)).vector
+        case _:
+            raise ValueError("Unsupported feature type")
+
+
+async def collection_version(ctx: AsyncAppContext) -> CollectionVersion:
+    """`result_cache.collection_version`, reading and filling the same cache."""
+    cached = result_cache.collection_version
+    key = cached.cache_key(ctx)
+    version = cached.lookup(key)
+    if version is not None:
+        return version
+
+    info = await ctx.client.get_collection(ctx.settings.qdrant_collection)
+    version = version_from_info(info)
+
+    cached.store(key, version)
+    return version
+
+
+async def run_similarity_search(
+    ctx: AsyncAppContext,
+    query_obj: Query,
+    hnsw_ef: int | None = None,
+    exact: bool = False,
+) -> TimedQueryResponse:
+    cache = ctx.result_cache
+    if cache is None:
+        return await search_points(ctx, query_obj, hnsw_ef=hnsw_ef, exact=exact)
+
+    version = await collection_version(ctx)
+    window = ctx.settings.page_window
+    end = candidates_end(query_obj, window)
+    if end is None:
+        key = result_key(ctx, version, query_obj, hnsw_ef, exact)
+        response = cache.get(key)
+        if response is None:
+            response = await search_points(
+                ctx, query_obj, hnsw_ef=hnsw_ef, exact=exact
+            )
+            cache.put(key, response)
+        return response
+
+    key = candidates_key(ctx, version, query_obj, hnsw_ef, exact)
+    candidates = cache.get(key)
+    missing = missing_candidates(query_obj, candidates, end, window)
+    if missing is not None:
+        more = await search_points(ctx, missing, hnsw_ef=hnsw_ef, exact=exact)
+        candidates = extend_candidates(candidates, more)
+        cache.put(key, candidates)
+    assert candidates is not None
+    return slice_page(query_obj, candidates)
+
+
+async def search_points(
+    ctx: AsyncAppContext,
+    query_obj: Query,
+    hnsw_ef: int | None = None,
+    exact: bool = False,
+) -> TimedQueryResponse:
+    query_input = node_point_id(query_obj.feature)
+    if query_input is None:
+        query_input = await get_embedding(ctx, query_obj.feature)
+
+    graph_filter = build_graph_filter(
+        query_obj.include_graphs, query_obj.exclude_graphs
+    )
+    search_params = make_search_params(ctx, hnsw_ef=hnsw_ef, exact=exact)
+
+    start_time = time.perf_counter()
+    resp = await ctx.client.query_points(
+        query=query_input,
+        collection_name=ctx.settings.qdrant_collection,
+        query_filter=graph_filter,
+        with_payload=True,
+        limit=query_obj.limit,
+        offset=query_obj.offset,
+        search_params=search_params,
+        timeout=ctx.settings.qdrant_timeout,
+    )
+    end_time = time.perf_counter()
+
+    query_time = end_time - start_time
+
+    logger.debug(f"{query_time:.3f}s for query: {query_obj}")
+
+    return TimedQueryResponse(
+        points=resp.points,
+        time=query_time,
+    )
+
+
+async def get_graph_facets(ctx: AsyncAppContext) -> list[GraphFacet]:
+    """`graphs.get_graph_facets`, reading and filling the same cache."""
+    cached = graphs.get_graph_facets
+    key = cached.cache_key(ctx)
+    facets = cached.lookup(key)
+    if facets is not None:
+        return facets
+
+    res = await ctx.client.facet(
+        collection_name=ctx.settings.qdrant_collection,
+        key="graph",
+        limit=100,
+    )
+    facets = facets_from_response(res)
+
+    cached.store(key, facets)
+    return facets
+
+
+async def get_graphs(ctx: AsyncAppContext) -> list[str]:
+    return [facet.graph for facet in await get_graph_facets(ctx)]
+
+
+async def run_survey(
+    ctx: AsyncAppContext,
+    feature: Feature,
+    *,
+    include_graphs: list[str] | None = None,
+    exclude_graphs: list[str] | None = None,
+    limit: int = 5,
+    exact: bool = False,
+    hnsw_ef: int | None = None,
+) -> list[GraphSurveyResult]:
+    all_graphs = await get_graphs(ctx) if not include_graphs else []
+    target_graphs = resolve_target_graphs(
+        all_graphs, include_graphs, exclude_graphs
+    )
+
+    if not target_graphs:
+        return []
+
+    query_input = node_point_id(feature)
+    if query_input is None:
+        query_input = (await get_embedding(ctx, feature)).tolist()
+
+    requests = survey_requests(
+        ctx,
+        target_graphs,
+        query_input,
+        limit=limit,
+        exact=exact,
+        hnsw_ef=hnsw_ef,
+    )
+
+    start_time = time.perf_counter()
+    responses = await ctx.client.query_batch_points(
+        collection_name=ctx.settings.qdrant_collection,
+        requests=requests,
+        timeout=ctx.settings.qdrant_timeout,
+    )
+    elapsed = time.perf_counter() - start_time
+
+    logger.debug(f"{elapsed:.3f}s for survey over {len(target_graphs)} graphs")
+
+    return rank_survey(target_graphs, responses)
+
+
+async def lookup_nodes(
+    ctx: AsyncAppContext, iris: list[str]
+) -> dict[str, NodePoint]:
+    found = cached_nodes(ctx, iris)
+    missing = [iri for iri in iris if iri not in found]
+    if not missing:
+        return found
+
+    wanted = set(missing)
+    resolved: dict[str, NodePoint] = {}
+    offset = None
+    while True:
+        points, offset = await ctx.client.scroll(
+            collection_name=ctx.settings.qdrant_collection,
+            scroll_filter=iris_filter(missing),
+            limit=len(missing),
+            offset=offset,
+            with_payload=["iri"],
+            with_vectors=True,
+        )
+        collect_nodes(points, wanted, resolved)
+        if offset is None or len(resolved) == len(wanted):
+            break
+
+    cache_nodes(ctx, resolved)
+    return found | resolved
+
+
+async def run_batch_search(
+    ctx: AsyncAppContext,
+    queries: list[Query],
+    hnsw_ef: int | None = None,
+    exact: bool = False,
+) -> list[BatchResult]:
+    texts, iris = batch_inputs(queries)
+    vectors = (
+        dict(
+            zip(
+                texts,
+                await asyncio.to_thread(ctx.embedder.embed_many, texts),
+                strict=True,
+            )
+        )
+        if texts
+        else {}
+    )
+    nodes = await lookup_nodes(ctx, iris) if iris else {}
+
+    requests, slots, results = plan_batch(
+        queries,
+        vectors,
+        nodes,
+        make_search_params(ctx, hnsw_ef=hnsw_ef, exact=exact),
+    )
+
+    if requests:
+        start_time = time.perf_counter()
+        responses = await ctx.client.query_batch_points(
+            collection_name=ctx.settings.qdrant_collection,
+            requests=requests,
+            timeout=ctx.settings.qdrant_timeout,
+        )
+        elapsed = time.perf_counter() - start_time
+        logger.debug(f"{elapsed:.3f}s for batch of {len(requests)} queries")
+
+        for slot, response in zip(slots, responses, strict=True):
+            results[slot] = response
+
+    return [result for result in results if result is not None]
@@ -0,0 +1,208 @@
+"""Many similarity searches in one round trip each for embedding, IRI lookup
+and search.
+
+For callers with a list of queries (downstream lookup jobs, bulk "find
+similar"), per-query overhead dominates: one session call, one IRI scroll and
+one HTTP request each. Here every text is embedded in one `embed_many` call,
+every IRI is resolved by one filtered scroll, and all searches go to Qdrant as
+one `query_batch_points` request.
+"""
+
+import time
+
+import numpy as np
+from loguru import logger
+from qdrant_client.models import (
+    ExtendedPointId,
+    FieldCondition,
+    Filter,
+    MatchAny,
+    QueryRequest,
+    QueryResponse,
+    Record,
+    SearchParams,
+)
+
+from ..config import AppContext, AsyncAppContext
+from .errors import URINotFoundError
+from .models import NodeFeature, Query, TextFeature
+from .query import (
+    NodePoint,
+    build_graph_filter,
+    lookup_node,
+    make_search_params,
+    node_from_points,
+    node_point_id,
+)
+
+BatchResult = QueryResponse | URINotFoundError
+
+
+def cached_nodes(
+    ctx: AppContext | AsyncAppContext, iris: list[str]
+) -> dict[str, NodePoint]:
+    """The IRIs already in `lookup_node`'s cache, counted in its stats."""
+    found: dict[str, NodePoint] = {}
+    for iri in iris:
+        node = lookup_node.lookup(lookup_node.cache_key(ctx, iri))
+        if node is not None:
+            found[iri] = node
+    return found
+
+
+def cache_nodes(
+    ctx: AppContext | AsyncAppContext, nodes: dict[str, NodePoint]
+) -> None:
+    for iri, node in nodes.items():
+        lookup_node.store(lookup_node.cache_key(ctx, iri), node)
+
+
+def iris_filter(iris: list[str]) -> Filter:
+    return Filter(must=[FieldCondition(key="iri", match=MatchAny(any=iris))])
+
+
+def collect_nodes(
+    points: list[Record],
+    wanted: set[str],
+    found: dict[str, NodePoint],
+) -> None:
+    """Assign scrolled points to the wanted IRIs in their payload.
+
+    A point carries every IRI that shares its text, and an IRI can appear in
+    more than one graph. Scroll returns points in id order, so keeping the
+    first point seen per IRI matches what a single `lookup_node` returns.
+    """
+    for point in points:
+        iris = (point.payload or {}).get("iri") or []
+        if isinstance(iris, str):
+            iris = [iris]
+        for iri in iris:
+            if iri in wanted and iri not in found:
+                found[iri] = node_from_points(iri, [point])
+
+
+def lookup_nodes(ctx: AppContext, iris: list[str]) -> dict[str, NodePoint]:
+    """Resolve many IRIs at once. IRIs that are not found are left out."""
+    found = cached_nodes(ctx, iris)
+    missing = [iri for iri in iris if iri not in found]
+    if not missing:
+        return found
+
+    wanted = set(missing)
+    resolved: dict[str, NodePoint] = {}
+    offset = None
+    while True:
+        points, offset = ctx.client.scroll(
+            collection_name=ctx.settings.qdrant_collection,
+            scroll_filter=iris_filter(missing),
+            limit=len(missing),
+            offset=offset,
+            with_payload=["iri"],
+            with_vectors=True,
+        )
+        collect_nodes(points, wanted, resolved)
+        if offset is None or len(resolved) == len(wanted):
+            break
+
+    cache_nodes(ctx, resolved)
+    return found | resolved
+
+
+def plan_batch(
+    queries: list[Query],
+    vectors: dict[str, np.ndarray],
+    nodes: dict[str, NodePoint],
+    search_params: SearchParams,
+) -> tuple[list[QueryRequest], list[int], list[BatchResult | None]]:
+    """Turn queries into batch requests, given their resolved vectors.
+
+    Returns the requests, the index of the query each one answers, and a
+    result list that already holds the error for each query that could not be
+    resolved.
+    """
+    requests: list[QueryRequest] = []
+    slots: list[int] = []
+    results: list[BatchResult | None] = [None] * len(queries)
+
+    for i, query_obj in enumerate(queries):
+        feature = query_obj.feature
+        query: list[float] | ExtendedPointId | None = node_point_id(feature)
+        if query is None:
+            if isinstance(feature, TextFeature):
+                query = vectors[feature.value].tolist()
+            elif feature.value in nodes:
+                query = nodes[feature.value].vector.tolist()
+            else:
+                results[i] = URINotFoundError(f"URI not found: {feature.value}")
+                continue
+
+        requests.append(
+            QueryRequest(
+                query=query,
+                filter=build_graph_filter(
+                    query_obj.include_graphs, query_obj.exclude_graphs
+                ),
+                limit=query_obj.limit,
+                offset=query_obj.offset,
+                with_payload=True,
+                params=search_params,
+            )
+        )
+        slots.append(i)
+
+    return requests, slots, results
+
+
+def batch_inputs(queries: list[Query]) -> tuple[list[str], list[str]]:
+    """The distinct texts to embed and IRIs to resolve for `queries`."""
+    texts: dict[str, None] = {}
+    iris: dict[str, None] = {}
+    for query_obj in queries:
+        feature = query_obj.feature
+        if isinstance(feature, TextFeature):
+            texts[feature.value] = None
+        elif isinstance(feature, NodeFeature) and feature.point_id is None:
+            iris[feature.value] = None
+    return list(texts), list(iris)
+
+
+def run_batch_search(
+    ctx: AppContext,
+    queries: list[Query],
+    hnsw_ef: int | None = None,
+    exact: bool = False,
+) -> list[BatchResult]:
+    """Run `queries` together; one result per query, in order.
+
+    A node query whose IRI is not in the collection gets a
+    `URINotFoundError` in its slot rather than failing the whole batch.
+    """
+    texts, iris = batch_inputs(queries)
+    vectors = (
+        dict(zip(texts, ctx.embedder.embed_many(texts), strict=True))
+        if texts
+        else {}
+    )
+    nodes = lookup_nodes(ctx, iris) if iris else {}
+
+    requests, slots, results = plan_batch(
+        queries,
+        vectors,
+        nodes,
+        make_search_params(ctx, hnsw_ef=hnsw_ef, exact=exact),
+    )
+
+    if requests:
+        start_time = time.perf_counter()
+        responses = ctx.client.query_batch_points(
+            collection_name=ctx.settings.qdrant_collection,
+            requests=requests,
+            timeout=ctx.settings.qdrant_timeout,
+        )
+        elapsed = time.perf_counter() - start_time
+        logger.debug(f"{elapsed:.3f}s for batch of {len(requests)} queries")
+
+        for slot, response in zip(slots, responses, strict=True):
+            results[slot] = response
+
+    return [result for result in results if result is not None]
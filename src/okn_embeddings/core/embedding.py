@@ -1,6 +1,13 @@
-from typing import TYPE_CHECKING, Protocol
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Protocol
 
 import numpy as np
+from cachetools import LRUCache
 from fastembed import TextEmbedding
 
 if TYPE_CHECKING:
@@ -53,6 +60,203 @@ class FastEmbedEmbedder:
         ]
 
 
+class LazyEmbedder:
+    """Builds the wrapped embedder on first use rather than up front.
+
+    Loading the ONNX model is most of a cold start, and plenty of callers
+    never embed text: `list-graphs`, node searches, workers that only see
+    "find similar". They now skip the load entirely.
+    """
+
+    def __init__(self, factory: Callable[[], Embedder]):
+        self._factory = factory
+        self._embedder: Embedder | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._embedder is not None
+
+    def load(self) -> Embedder:
+        if self._embedder is None:
+            with self._lock:
+                if self._embedder is None:
+                    self._embedder = self._factory()
+        return self._embedder
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.load().embed(text)
+
+    def embed_many(self, texts: list[str]) -> list[np.ndarray]:
+        return self.load().embed_many(texts)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def normalize_query_text(text: str) -> str:
+    """Collapse runs of whitespace, so trivially different queries share a key.
+
+    The tokenizer already ignores this whitespace, so the normalized text
+    embeds to the same vector as the original.
+    """
+    return " ".join(text.split())
+
+
+class CachedEmbedder:
+    """LRU cache in front of another embedder's single-text `embed`.
+
+    Meant for the query path, where a few hundred popular queries make up most
+    traffic. Keys are `(model_name, normalized text)`, so a cache can never
+    hand back a vector from a different model. `embed_many` is passed straight
+    through: the bulk uploader embeds each text once, so caching it would only
+    evict the query entries.
+
+    Returned arrays are shared between callers; treat them as read-only.
+    """
+
+    def __init__(self, inner: Embedder, model_name: str, maxsize: int):
+        self.inner = inner
+        self.model_name = model_name
+        self._cache: LRUCache[tuple[str, str], np.ndarray] = LRUCache(
+            maxsize=maxsize
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, text: str) -> np.ndarray:
+        text = normalize_query_text(text)
+        key = (self.model_name, text)
+
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self.hits += 1
+                return vector
+            self.misses += 1
+
+        # Embed outside the lock so one slow miss does not serialize the
+        # hits behind it. Two concurrent misses on the same text both embed;
+        # the result is identical, so the second write is harmless.
+        vector = self.inner.embed(text)
+        vector.flags.writeable = False
+
+        with self._lock:
+            self._cache[key] = vector
+
+        return vector
+
+    def embed_many(self, texts: list[str]) -> list[np.ndarray]:
+        return self.inner.embed_many(texts)
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                size=len(self._cache),
+                maxsize=int(self._cache.maxsize),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class BatchingEmbedder:
+    """Coalesce concurrent single-text `embed` calls into `embed_many` batches.
+
+    Under a threaded server several requests can be embedding at once, and
+    running them as one batch is much cheaper than one session call each. The
+    first call to arrive opens a batch; calls arriving within `max_wait`
+    seconds join it, up to `max_batch_size`. A background thread runs the
+    batch and hands each caller its own vector (or the batch's exception).
+
+    The thread is started lazily and restarted after a fork, so an instance
+    built before gunicorn forks its workers still works in each of them.
+    """
+
+    def __init__(
+        self,
+        inner: Embedder,
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+    ):
+        self.inner = inner
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: queue.SimpleQueue[tuple[str, Future]] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._pid: int | None = None
+
+    def embed(self, text: str) -> np.ndarray:
+        pending = self._ensure_worker()
+        future: Future[np.ndarray] = Future()
+        pending.put((text, future))
+        return future.result()
+
+    def embed_many(self, texts: list[str]) -> list[np.ndarray]:
+        return self.inner.embed_many(texts)
+
+    def _ensure_worker(self) -> queue.SimpleQueue:
+        pid = os.getpid()
+        with self._lock:
+            if self._pid != pid:
+                # Threads do not survive a fork, so a child gets a fresh queue
+                # and its own worker rather than the parent's dead one.
+                self._queue = queue.SimpleQueue()
+                threading.Thread(
+                    target=self._run,
+                    args=(self._queue,),
+                    name="embed-batcher",
+                    daemon=True,
+                ).start()
+                self._pid = pid
+            return self._queue
+
+    def _run(self, pending: queue.SimpleQueue) -> None:
+        while True:
+            batch = [pending.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Anything that goes wrong with the batch, including a vector
+            # count that does not match it, goes to every caller: an escaping
+            # exception would end this thread with `_pid` still set, and every
+            # later `embed` would wait forever.
+            try:
+                vectors = self.inner.embed_many([text for text, _ in batch])
+                results = list(zip(batch, vectors, strict=True))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), vector in results:
+                future.set_result(vector)
+
+
 def make_embedder(settings: "AppSettings") -> Embedder:
     """Construct the configured embedder.
 
@@ -64,3 +268,26 @@ def make_embedder(settings: "AppSettings") -> Embedder:
         threads=settings.embed_threads,
         parallel=settings.embed_parallel,
     )
+
+
+def make_query_embedder(settings: "AppSettings") -> Embedder:
+    """The configured embedder, wrapped for the query path.
+
+    The model loads on the first embed. Cache misses (or every call, with the
+    cache off) go through the micro-batcher when it is enabled, so only
+    distinct texts are coalesced.
+    """
+    embedder: Embedder = LazyEmbedder(lambda: make_embedder(settings))
+    if settings.embed_batch_wait_ms > 0:
+        embedder = BatchingEmbedder(
+            embedder,
+            max_batch_size=settings.embed_batch_max_size,
+            max_wait=settings.embed_batch_wait_ms / 1000,
+        )
+    if settings.query_cache_size <= 0:
+        return embedder
+    return CachedEmbedder(
+        embedder,
+        model_name=settings.model_name,
+        maxsize=settings.query_cache_size,
+    )
@@ -2,12 +2,22 @@ import time
 from dataclasses import dataclass
 
 from loguru import logger
-from qdrant_client.models import QueryRequest, ScoredPoint
-
-from ..config import AppContext
+from qdrant_client.models import (
+    ExtendedPointId,
+    QueryRequest,
+    QueryResponse,
+    ScoredPoint,
+)
+
+from ..config import AppContext, AsyncAppContext
 from .graphs import get_graphs
 from .models import Feature
-from .query import build_graph_filter, get_embedding, make_search_params
+from .query import (
+    build_graph_filter,
+    get_embedding,
+    make_search_params,
+    node_point_id,
+)
 
 
 @dataclass
@@ -65,19 +75,13 @@ def run_survey(
     if not graphs:
         return []
 
-    query_vector = get_embedding(ctx, feature).tolist()
-    search_params = make_search_params(ctx, hnsw_ef=hnsw_ef, exact=exact)
+    query = node_point_id(feature)
+    if query is None:
+        query = get_embedding(ctx, feature).tolist()
 
-    requests = [
-        QueryRequest(
-            query=query_vector,
-            filter=build_graph_filter([graph], None),
-            limit=limit,
-            with_payload=True,
-            params=search_params,
-        )
-        for graph in graphs
-    ]
+    requests = survey_requests(
+        ctx, graphs, query, limit=limit, exact=exact, hnsw_ef=hnsw_ef
+    )
 
     start_time = time.perf_counter()
     responses = ctx.client.query_batch_points(
@@ -89,6 +93,38 @@ def run_survey(
 
     logger.debug(f"{elapsed:.3f}s for survey over {len(graphs)} graphs")
 
+    return rank_survey(graphs, responses)
+
+
+def survey_requests(
+    ctx: AppContext | AsyncAppContext,
+    graphs: list[str],
+    query: list[float] | ExtendedPointId,
+    *,
+    limit: int,
+    exact: bool,
+    hnsw_ef: int | None,
+) -> list[QueryRequest]:
+    """One graph-filtered similarity request per graph, for a batched call."""
+    search_params = make_search_params(ctx, hnsw_ef=hnsw_ef, exact=exact)
+
+    return [
+        QueryRequest(
+            query=query,
+            filter=build_graph_filter([graph], None),
+            limit=limit,
+            with_payload=True,
+            params=search_params,
+        )
+        for graph in graphs
+    ]
+
+
+def rank_survey(
+    graphs: list[str],
+    responses: list[QueryResponse],
+) -> list[GraphSurveyResult]:
+    """Pair batched responses with their graphs, best-scoring graph first."""
     results = [
         GraphSurveyResult(graph=graph, points=resp.points)
         for graph, resp in zip(graphs, responses, strict=True)
@@ -1,7 +1,11 @@
+import threading
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
-from cachetools import TTLCache, cached
+from cachetools import TTLCache
+from qdrant_client.models import FacetResponse
+
+from .memo import cached
 
 if TYPE_CHECKING:
     from ..config import AppContext
@@ -16,6 +20,7 @@ class GraphFacet:
 @cached(
     cache=TTLCache(maxsize=1, ttl=60 * 10),
     key=lambda ctx: ctx.settings.qdrant_location,
+    lock=threading.Lock(),
 )
 def get_graph_facets(ctx: "AppContext") -> list[GraphFacet]:
     res = ctx.client.facet(
@@ -24,6 +29,10 @@ def get_graph_facets(ctx: "AppContext") -> list[GraphFacet]:
         limit=100,
     )
 
+    return facets_from_response(res)
+
+
+def facets_from_response(res: FacetResponse) -> list[GraphFacet]:
     return [GraphFacet(str(hit.value).strip(), hit.count) for hit in res.hits]
 
 
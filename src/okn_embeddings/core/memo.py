@@ -0,0 +1,87 @@
+"""`cachetools.cached` with hit/miss counters the asyncio path can share.
+
+The asyncio entry points in `aio` cannot call a cached synchronous function
+(its body does blocking Qdrant I/O), so they read and fill its cache
+themselves. cachetools keeps its `info=True` counters in a closure, where
+those reads would be invisible and `/cache-stats` would under-report on the
+ASGI app. Here the counters live on the wrapper, and `lookup` / `store` give
+the asyncio code the same counted access the synchronous call gets.
+"""
+
+import threading
+from collections import namedtuple
+from collections.abc import Callable, Hashable
+from functools import update_wrapper
+from typing import Any
+
+from cachetools import Cache
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class _Cached:
+    def __init__(
+        self,
+        func: Callable,
+        cache: Cache,
+        key: Callable[..., Hashable],
+        lock: threading.Lock,
+    ):
+        self.func = func
+        self.cache = cache
+        self.cache_key = key
+        self.cache_lock = lock
+        self.hits = self.misses = 0
+        update_wrapper(self, func)
+
+    def __call__(self, *args, **kwargs):
+        key = self.cache_key(*args, **kwargs)
+        value = self.lookup(key)
+        if value is None:
+            value = self.func(*args, **kwargs)
+            self.store(key, value)
+        return value
+
+    def lookup(self, key: Hashable) -> Any | None:
+        """The cached value for `key`, or None, counted as a hit or miss."""
+        with self.cache_lock:
+            value = self.cache.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def store(self, key: Hashable, value: Any) -> None:
+        with self.cache_lock:
+            try:
+                self.cache[key] = value
+            except ValueError:
+                pass  # value too large
+
+    def cache_info(self) -> CacheInfo:
+        with self.cache_lock:
+            return CacheInfo(
+                self.hits, self.misses, self.cache.maxsize, self.cache.currsize
+            )
+
+    def cache_clear(self) -> None:
+        with self.cache_lock:
+            self.cache.clear()
+            self.hits = self.misses = 0
+
+
+def cached(
+    cache: Cache,
+    key: Callable[..., Hashable],
+    lock: threading.Lock,
+) -> Callable[[Callable], _Cached]:
+    """Like `cachetools.cached(cache, key, lock, info=True)`.
+
+    Cached values must not be None: None is how `lookup` reports a miss.
+    """
+
+    def decorator(func: Callable) -> _Cached:
+        return _Cached(func, cache, key, lock)
+
+    return decorator
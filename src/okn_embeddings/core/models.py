@@ -1,4 +1,5 @@
 from typing import Annotated, Literal
+from uuid import UUID
 
 from pydantic import BaseModel, Field, TypeAdapter, model_validator
 from qdrant_client.http.models import QueryResponse
@@ -12,6 +13,10 @@ class TextFeature(BaseModel):
 class NodeFeature(BaseModel):
     type: Literal["node"]
     value: str
+    # The Qdrant point for `value`, when the caller already has it from an
+    # earlier result. Lets the search look the vector up server-side instead
+    # of resolving the IRI first; see `node_point_id`.
+    point_id: int | UUID | None = None
 
 
 Feature = Annotated[
@@ -36,18 +41,33 @@ class Query(BaseModel):
         return self
 
 
+class BatchQuery(BaseModel):
+    # Bounded so one request cannot hold a worker indefinitely; larger jobs
+    # split into several calls.
+    queries: list[Query] = Field(..., min_length=1, max_length=1000)
+
+
 class TimedQueryResponse(QueryResponse):
     time: float
 
 
-def build_feature(feature_type: str, value: str) -> Feature:
+def build_feature(
+    feature_type: str,
+    value: str,
+    point_id: str | None = None,
+) -> Feature:
     """Build (and validate) a text/node feature from raw parts.
 
     Shared by the CLI and web routes to turn raw input into the discriminated
-    feature union. Raises pydantic ``ValidationError`` on an unknown type.
+    feature union. `point_id` only applies to node features and is dropped
+    for text. Raises pydantic ``ValidationError`` on an unknown type.
     """
+    data = {"type": feature_type, "value": value}
+    if point_id and feature_type == "node":
+        data["point_id"] = point_id
+
     adapter = TypeAdapter(Feature)
-    return adapter.validate_python({"type": feature_type, "value": value})
+    return adapter.validate_python(data)
 
 
 def build_query(
@@ -57,6 +77,7 @@ def build_query(
     exclude_graphs: list[str] | None = None,
     limit: int | str = 10,
     offset: int | str = 0,
+    point_id: str | None = None,
 ) -> Query:
     """Assemble (and validate) a Query from individual parts.
 
@@ -65,7 +86,7 @@ def build_query(
     identically. Raises pydantic ``ValidationError`` on bad input.
     """
     data: dict = {
-        "feature": build_feature(feature_type, value),
+        "feature": build_feature(feature_type, value, point_id=point_id),
         "limit": limit,
         "offset": offset,
     }
@@ -1,18 +1,25 @@
+import threading
 import time
+from dataclasses import dataclass
+from uuid import UUID
 
 import numpy as np
+from cachetools import TTLCache
 from loguru import logger
 from qdrant_client.models import (
+    ExtendedPointId,
     FieldCondition,
     Filter,
     MatchAny,
     MatchValue,
     QuantizationSearchParams,
+    Record,
     SearchParams,
 )
 
-from ..config import AppContext
+from ..config import AppContext, AsyncAppContext
 from .errors import URINotFoundError
+from .memo import cached
 from .models import (
     Feature,
     NodeFeature,
@@ -20,6 +27,73 @@ from .models import (
     TextFeature,
     TimedQueryResponse,
 )
+from .result_cache import (
+    candidates_end,
+    candidates_key,
+    collection_version,
+    extend_candidates,
+    missing_candidates,
+    result_key,
+    slice_page,
+)
+
+
+@dataclass(frozen=True)
+class NodePoint:
+    """The stored point an IRI resolves to."""
+
+    id: ExtendedPointId
+    vector: np.ndarray
+
+
+# IRI -> point lookups repeat as users click "find similar" and page through
+# the results. A stored vector only changes when its graph is re-uploaded, so
+# a short TTL is enough to pick that up.
+@cached(
+    cache=TTLCache(maxsize=10_000, ttl=60 * 10),
+    key=lambda ctx, iri: (
+        ctx.settings.qdrant_location,
+        ctx.settings.qdrant_collection,
+        iri,
+    ),
+    lock=threading.Lock(),
+)
+def lookup_node(ctx: AppContext, iri: str) -> NodePoint:
+    points, _ = ctx.client.scroll(
+        collection_name=ctx.settings.qdrant_collection,
+        scroll_filter=iri_filter(iri),
+        limit=1,
+        with_vectors=True,
+    )
+    return node_from_points(iri, points)
+
+
+def iri_filter(iri: str) -> Filter:
+    return Filter(must=[FieldCondition(key="iri", match=MatchValue(value=iri))])
+
+
+def node_from_points(iri: str, points: list[Record]) -> NodePoint:
+    """The `NodePoint` for the result of an `iri_filter` lookup."""
+    if not points:
+        raise URINotFoundError(f"URI not found: {iri}")
+
+    vector = np.array(points[0].vector, dtype=np.float32)
+    vector.flags.writeable = False
+    return NodePoint(id=points[0].id, vector=vector)
+
+
+def node_point_id(feature: Feature) -> ExtendedPointId | None:
+    """The point id to query by directly, if the feature carries one.
+
+    Querying by id has Qdrant read the stored vector itself, skipping the IRI
+    lookup round trip. Qdrant leaves the queried point out of its own results,
+    so the source node is not listed as its own best match on this path.
+    """
+    if not isinstance(feature, NodeFeature) or feature.point_id is None:
+        return None
+    if isinstance(feature.point_id, UUID):
+        return str(feature.point_id)
+    return feature.point_id
 
 
 def get_embedding(
@@ -30,22 +104,7 @@ def get_embedding(
         case TextFeature(type="text"):
             return ctx.embedder.embed(feature.value)
         case NodeFeature(type="node"):
-            points, _ = ctx.client.scroll(
-                collection_name=ctx.settings.qdrant_collection,
-                scroll_filter=Filter(
-                    must=[
-                        FieldCondition(
-                            key="iri", match=MatchValue(value=feature.value)
-                        )
-                    ]
-                ),
-                limit=1,
-                with_vectors=True,
-            )
-            if not points:
-                raise URINotFoundError(f"URI not found: {feature.value}")
-            vec = points[0].vector
-            return np.array(vec, dtype=np.float32)
+            return lookup_node(ctx, feature.value).vector
         case _:
             raise ValueError("Unsupported feature type")
 
@@ -76,7 +135,7 @@ def build_graph_filter(
 
 
 def make_search_params(
-    ctx: AppContext,
+    ctx: AppContext | AsyncAppContext,
     hnsw_ef: int | None = None,
     exact: bool = False,
 ) -> SearchParams:
@@ -97,7 +156,48 @@ def run_similarity_search(
     hnsw_ef: int | None = None,
     exact: bool = False,
 ) -> TimedQueryResponse:
-    vector = get_embedding(ctx, query_obj.feature)
+    cache = ctx.result_cache
+    if cache is None:
+        return search_points(ctx, query_obj, hnsw_ef=hnsw_ef, exact=exact)
+
+    version = collection_version(ctx)
+    window = ctx.settings.page_window
+    end = candidates_end(query_obj, window)
+    if end is None:
+        key = result_key(ctx, version, query_obj, hnsw_ef, exact)
+        response = cache.get(key)
+        if response is None:
+            response = search_points(
+                ctx, query_obj, hnsw_ef=hnsw_ef, exact=exact
+            )
+            cache.put(key, response)
+        return response
+
+    key = candidates_key(ctx, version, query_obj, hnsw_ef, exact)
+    candidates = cache.get(key)
+    missing = missing_candidates(query_obj, candidates, end, window)
+    if missing is not None:
+        more = search_points(ctx, missing, hnsw_ef=hnsw_ef, exact=exact)
+        candidates = extend_candidates(candidates, more)
+        cache.put(key, candidates)
+    assert candidates is not None
+    return slice_page(query_obj, candidates)
+
+
+def search_points(
+    ctx: AppContext,
+    query_obj: Query,
+    hnsw_ef: int | None = None,
+    exact: bool = False,
+) -> TimedQueryResponse:
+    """`run_similarity_search` without the result cache.
+
+    A text vector goes to the client as the numpy array: it converts it for
+    whichever transport is in use, so there is no point making a list first.
+    """
+    query = node_point_id(query_obj.feature)
+    if query is None:
+        query = get_embedding(ctx, query_obj.feature)
 
     graph_filter = build_graph_filter(
         query_obj.include_graphs, query_obj.exclude_graphs
@@ -106,7 +206,7 @@ def run_similarity_search(
 
     start_time = time.perf_counter()
     resp = ctx.client.query_points(
-        query=vector.tolist(),
+        query=query,
         collection_name=ctx.settings.qdrant_collection,
         query_filter=graph_filter,
         with_payload=True,
@@ -0,0 +1,233 @@
+"""Cache of whole search responses, keyed by the normalized query.
+
+The HTMX UI repeats identical queries constantly as users page back and
+forth, and the CLI and evaluation runs repeat them too. A hit skips both the
+embedding and the Qdrant round trip.
+
+Entries are keyed on the collection's version as well as the query, so an
+upload makes every older entry unreachable (they then age out). The version
+is `points_count` plus an `upload_generation` marker that `upload` writes to
+the collection metadata, since re-uploading changed records in place need not
+change the count. Reading the version is itself a Qdrant call, so it is cached
+for a much shorter TTL than the results.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from cachetools import TTLCache
+from qdrant_client.models import CollectionInfo
+
+from .embedding import normalize_query_text
+from .memo import cached
+from .models import NodeFeature, Query, TimedQueryResponse
+
+if TYPE_CHECKING:
+    from ..config import AppContext, AsyncAppContext
+    from ..config.settings import AppSettings
+
+UPLOAD_GENERATION_KEY = "upload_generation"
+
+CollectionVersion = tuple[int | None, str | None]
+ResultKey = tuple
+
+
+@dataclass(frozen=True)
+class ResultCacheStats:
+    hits: int
+    misses: int
+    entries: int
+    size_bytes: int
+    maxsize_bytes: int
+
+
+def version_from_info(info: CollectionInfo) -> CollectionVersion:
+    metadata = info.config.metadata or {}
+    generation = metadata.get(UPLOAD_GENERATION_KEY)
+    return info.points_count, str(generation) if generation else None
+
+
+@cached(
+    cache=TTLCache(maxsize=16, ttl=30),
+    key=lambda ctx: (
+        ctx.settings.qdrant_location,
+        ctx.settings.qdrant_collection,
+    ),
+    lock=threading.Lock(),
+)
+def collection_version(ctx: "AppContext") -> CollectionVersion:
+    return version_from_info(
+        ctx.client.get_collection(ctx.settings.qdrant_collection)
+    )
+
+
+def result_key(
+    ctx: "AppContext | AsyncAppContext",
+    version: CollectionVersion,
+    query_obj: Query,
+    hnsw_ef: int | None,
+    exact: bool,
+) -> ResultKey:
+    """Everything that determines a response, in a canonical form.
+
+    Graph lists are sorted (the filter ignores their order) and text is
+    whitespace-normalized the same way the embedding cache normalizes it.
+    """
+    feature = query_obj.feature
+    value = feature.value
+    point_id = None
+    if isinstance(feature, NodeFeature):
+        point_id = feature.point_id
+    else:
+        value = normalize_query_text(value)
+
+    return (
+        ctx.settings.qdrant_location,
+        ctx.settings.qdrant_collection,
+        version,
+        feature.type,
+        value,
+        point_id,
+        tuple(sorted(query_obj.include_graphs or ())),
+        tuple(sorted(query_obj.exclude_graphs or ())),
+        query_obj.limit,
+        query_obj.offset,
+        ctx.settings.qdrant_hnsw_ef if hnsw_ef is None else hnsw_ef,
+        exact,
+    )
+
+
+def candidates_key(
+    ctx: "AppContext | AsyncAppContext",
+    version: CollectionVersion,
+    query_obj: Query,
+    hnsw_ef: int | None,
+    exact: bool,
+) -> ResultKey:
+    """The key of a query's cached ranking, shared by all its deep pages."""
+    whole = query_obj.model_copy(update={"offset": 0, "limit": 0})
+    return ("candidates", *result_key(ctx, version, whole, hnsw_ef, exact))
+
+
+def candidates_end(query_obj: Query, window: int) -> int | None:
+    """How far into the ranking a page's cached candidate list must reach.
+
+    Qdrant serves `offset` by ranking and discarding every earlier result,
+    so fetching page N on its own costs N pages. Instead the pages past the
+    first share one cached ranking per query, grown a whole number of
+    `window`s at a time: paging within it is a cache hit, and paging past
+    its end fetches only the missing results. That fetch starts at the
+    list's end, so it still pays Qdrant's offset cost once per extension;
+    jumping straight to a deep page pays it in full, as a direct fetch
+    would. Returns None when the page is fetched as is: the first page (kept
+    cheap) or windowing off (0).
+    """
+    if window <= 0 or query_obj.offset == 0:
+        return None
+    end = query_obj.offset + query_obj.limit
+    return -(-end // window) * window
+
+
+def missing_candidates(
+    query_obj: Query,
+    candidates: TimedQueryResponse | None,
+    end: int,
+    window: int,
+) -> Query | None:
+    """The query for the results `candidates` lacks up to `end`, if any.
+
+    A list is only ever grown to a whole number of windows, so one that is
+    not ended early: the ranking has no more results to fetch.
+    """
+    have = 0 if candidates is None else len(candidates.points)
+    if have >= end or (candidates is not None and have % window):
+        return None
+    return query_obj.model_copy(update={"offset": have, "limit": end - have})
+
+
+def extend_candidates(
+    candidates: TimedQueryResponse | None,
+    more: TimedQueryResponse,
+) -> TimedQueryResponse:
+    if candidates is None:
+        return more
+    return TimedQueryResponse(
+        points=candidates.points + more.points,
+        time=candidates.time + more.time,
+    )
+
+
+def slice_page(
+    query_obj: Query, candidates: TimedQueryResponse
+) -> TimedQueryResponse:
+    start = query_obj.offset
+    return TimedQueryResponse(
+        points=candidates.points[start : start + query_obj.limit],
+        time=candidates.time,
+    )
+
+
+def response_size(response: TimedQueryResponse) -> int:
+    # Serialized size tracks the payloads, which dominate an entry's memory.
+    # Computed once per insert, i.e. only on a miss.
+    return len(response.model_dump_json())
+
+
+class ResultCache:
+    """TTL cache of `TimedQueryResponse`s, bounded by approximate bytes.
+
+    A cached response is returned as is, including the `time` its original
+    query took.
+    """
+
+    def __init__(self, maxsize_bytes: int, ttl: float):
+        self._cache: TTLCache[ResultKey, TimedQueryResponse] = TTLCache(
+            maxsize=maxsize_bytes, ttl=ttl, getsizeof=response_size
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: ResultKey) -> TimedQueryResponse | None:
+        with self._lock:
+            response = self._cache.get(key)
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return response
+
+    def put(self, key: ResultKey, response: TimedQueryResponse) -> None:
+        with self._lock:
+            try:
+                self._cache[key] = response
+            except ValueError:
+                # Larger than the whole cache; just don't keep it.
+                pass
+
+    @property
+    def stats(self) -> ResultCacheStats:
+        with self._lock:
+            return ResultCacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                entries=len(self._cache),
+                size_bytes=int(self._cache.currsize),
+                maxsize_bytes=int(self._cache.maxsize),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def make_result_cache(settings: "AppSettings") -> ResultCache | None:
+    if settings.result_cache_mb <= 0:
+        return None
+    return ResultCache(
+        maxsize_bytes=settings.result_cache_mb * 1024 * 1024,
+        ttl=settings.result_cache_ttl,
+    )
@@ -0,0 +1,53 @@
+"""Adaptive batch sizes for the uploader.
+
+The best `--batch-size` and `--upload-batch-size` depend on record length,
+the model and how loaded Qdrant is, so fixed values end up hand-tuned per
+graph. With `upload --adaptive`, each is instead steered towards a latency
+budget: after every embed call or upsert, the controller works out the size
+that would have taken exactly the budget at the throughput just observed,
+and moves halfway there, within bounds. Halving the step keeps one slow call
+(a GC pause, a Qdrant flush) from swinging the size across its range.
+"""
+
+import threading
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class AdaptiveBatching:
+    """Bounds and latency budget shared by both batch-size controllers."""
+
+    min_size: int = 16
+    max_size: int = 4096
+    # Seconds one embed call or one upsert should take.
+    target_seconds: float = 1.0
+
+
+class BatchSizeController:
+    """Track one batch size, adjusting it after each timed batch.
+
+    Without a `config` the size stays fixed, so callers can time every batch
+    whether or not adaptive sizing is on.
+    """
+
+    def __init__(self, size: int, config: AdaptiveBatching | None = None):
+        self.config = config
+        self._size = self._clamp(size)
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _clamp(self, size: float) -> int:
+        if self.config is None:
+            return round(size)
+        return max(self.config.min_size, min(self.config.max_size, round(size)))
+
+    def observe(self, count: int, seconds: float) -> None:
+        """Record that a batch of `count` items took `seconds`."""
+        if self.config is None or count <= 0 or seconds <= 0:
+            return
+        ideal = self.config.target_seconds * count / seconds
+        with self._lock:
+            self._size = self._clamp((self._size + ideal) / 2)
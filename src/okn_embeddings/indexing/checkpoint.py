@@ -0,0 +1,73 @@
+"""Upload checkpoints, so an interrupted `upload` can resume mid-file.
+
+After each acknowledged upsert the uploader records how far into the input it
+has committed: the byte offset just past the last upserted record, and the
+line and record counts at that point. `upload --resume` seeks straight to that
+offset instead of re-embedding the file from the start.
+
+A checkpoint only applies to the exact input and target it was written for.
+`fingerprint` hashes the file's size and mtime together with the settings
+that decide which points get written (location, collection, model), and a
+checkpoint whose fingerprint differs is ignored.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from ..config import AppContext
+
+CHECKPOINT_SUFFIX = ".upload-checkpoint.json"
+
+
+@dataclass(frozen=True)
+class UploadCheckpoint:
+    fingerprint: str
+    # Bytes of the input consumed through the last acknowledged record.
+    offset: int = 0
+    # Input lines consumed (including blank ones), for `--limit` and errors.
+    line: int = 0
+    # Records read, uploaded or skipped; the next one's row in a sidecar.
+    read: int = 0
+    # Points acknowledged by Qdrant.
+    records: int = 0
+
+
+def checkpoint_path(path: Path, directory: Path | None = None) -> Path:
+    """Where the checkpoint for `path` lives: beside it, or in `directory`."""
+    return (directory or path.parent) / f"{path.name}{CHECKPOINT_SUFFIX}"
+
+
+def fingerprint(ctx: AppContext, path: Path) -> str:
+    stat = path.stat()
+    key = {
+        "file": str(path.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "location": ctx.settings.qdrant_location,
+        "collection": ctx.settings.qdrant_collection,
+        "model": ctx.settings.model_name,
+    }
+    encoded = json.dumps(key, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def load_checkpoint(path: Path, expected: str) -> UploadCheckpoint | None:
+    """Read a checkpoint, or None if it is missing, unreadable or stale."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        checkpoint = UploadCheckpoint(**data)
+    except (OSError, ValueError, TypeError):
+        return None
+    if checkpoint.fingerprint != expected:
+        return None
+    return checkpoint
+
+
+def save_checkpoint(path: Path, checkpoint: UploadCheckpoint) -> None:
+    """Write a checkpoint atomically, so a crash never leaves half of one."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(asdict(checkpoint)), encoding="utf-8")
+    os.replace(tmp, path)
@@ -1,6 +1,8 @@
 import sys
+from contextlib import ExitStack
+from dataclasses import asdict
 from pathlib import Path
-from typing import Annotated, NoReturn
+from typing import Annotated, Iterable, NoReturn
 
 import typer
 from loguru import logger
@@ -9,9 +11,14 @@ from ..config import AppContext
 from ..config.settings import load_settings
 from ..core.embedding import make_embedder
 from ..core.errors import friendly_error
+from .adaptive import AdaptiveBatching
 from .models import MaterializationConfiguration
-from .output import write_json, write_jsonl, write_text
-from .parallel import materialize_records_to_path
+from .output import OutputRecord, write_json, write_jsonl, write_text
+from .parallel import (
+    iter_shard_records,
+    materialize_records_to_path,
+    materialized_shards,
+)
 from .reader import load_graph
 from .sample import (
     sample_targets,
@@ -22,7 +29,8 @@ from .sample import (
     write_sample_types_text,
 )
 from .textify import materialize_records
-from .upload import upload_files
+from .upload import embed_file, upload_files, upload_stream
+from .vectors import vectors_path
 
 app = typer.Typer(add_completion=False, pretty_exceptions_enable=False)
 
@@ -50,7 +58,14 @@ def textify(
     ],
     output: Annotated[
         Path,
-        typer.Option("--output", "-o", help="Output path."),
+        typer.Option(
+            "--output",
+            "-o",
+            help=(
+                "Output path. A .gz or .zst suffix compresses the output "
+                "(e.g. graph.jsonl.zst)."
+            ),
+        ),
     ],
     text: Annotated[
         bool,
@@ -275,8 +290,9 @@ def upload(
         list[Path],
         typer.Argument(
             help=(
-                "JSONL embedding-record files to upload. Each file is one "
-                "graph, named by its stem (e.g. my-graph.jsonl -> my-graph)."
+                "JSONL embedding-record files to upload, optionally .gz or "
+                ".zst compressed. Each file is one graph, named without its "
+                "extensions (e.g. my-graph.jsonl.zst -> my-graph)."
             ),
         ),
     ],
@@ -296,6 +312,151 @@ def upload(
             help="Number of embedded points to upsert at once.",
         ),
     ] = 256,
+    upload_workers: Annotated[
+        int,
+        typer.Option(
+            "--upload-workers",
+            min=1,
+            help=(
+                "Number of upserts to keep in flight while the next batches "
+                "are read and embedded."
+            ),
+        ),
+    ] = 4,
+    max_unconfirmed: Annotated[
+        int,
+        typer.Option(
+            "--max-unconfirmed",
+            min=0,
+            help=(
+                "Send upserts without waiting for Qdrant to apply them, "
+                "waiting on every Nth so at most N are unapplied; all are "
+                "applied before the command exits. 0 waits on every upsert."
+            ),
+        ),
+    ] = 0,
+    bulk_load: Annotated[
+        bool,
+        typer.Option(
+            "--bulk-load",
+            help=(
+                "Defer HNSW indexing while uploading, then restore it and "
+                "wait (up to 6 hours) for the index to build. Much faster "
+                "for a full load; searches are slow until it finishes."
+            ),
+        ),
+    ] = False,
+    adaptive: Annotated[
+        bool,
+        typer.Option(
+            "--adaptive",
+            help=(
+                "Treat --batch-size and --upload-batch-size as starting "
+                "points and adjust both so that each embed call and upsert "
+                "takes about --batch-seconds."
+            ),
+        ),
+    ] = False,
+    batch_seconds: Annotated[
+        float,
+        typer.Option(
+            "--batch-seconds",
+            min=0.01,
+            help="Latency budget per embed call or upsert for --adaptive.",
+        ),
+    ] = 1.0,
+    min_batch_size: Annotated[
+        int,
+        typer.Option(
+            "--min-batch-size",
+            min=1,
+            help="Smallest batch size --adaptive may choose.",
+        ),
+    ] = 16,
+    max_batch_size: Annotated[
+        int,
+        typer.Option(
+            "--max-batch-size",
+            min=1,
+            help="Largest batch size --adaptive may choose.",
+        ),
+    ] = 4096,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            min=1,
+            help=(
+                "Number of input files to upload at once. They share the "
+                "--upload-workers limit on concurrent upserts."
+            ),
+        ),
+    ] = 1,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            "--resume",
+            help=(
+                "Continue each file from its upload checkpoint, if one "
+                "matches the file and target, instead of from the start. "
+                "Checkpoints are only written with --resume or "
+                "--checkpoint-dir, so pass it on the first run too."
+            ),
+        ),
+    ] = False,
+    checkpoint_dir: Annotated[
+        Path | None,
+        typer.Option(
+            "--checkpoint-dir",
+            file_okay=False,
+            help=(
+                "Write upload checkpoints here (default with --resume: "
+                "beside the inputs)."
+            ),
+        ),
+    ] = None,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            "--incremental",
+            help=(
+                "Only embed records whose point is not stored yet or whose "
+                "payload changed, and delete the graph's points that the "
+                "file no longer produces."
+            ),
+        ),
+    ] = False,
+    vector_cache: Annotated[
+        Path | None,
+        typer.Option(
+            "--vector-cache",
+            file_okay=False,
+            help=(
+                "Directory of previously embedded vectors, keyed by text "
+                "digest. Only texts not found there are embedded, and those "
+                "are added to it."
+            ),
+        ),
+    ] = None,
+    vectors: Annotated[
+        bool,
+        typer.Option(
+            "--vectors",
+            help=(
+                "Read each file's vectors from the sidecar written by "
+                "`okn-indexing embed` instead of embedding."
+            ),
+        ),
+    ] = False,
+    vectors_dir: Annotated[
+        Path | None,
+        typer.Option(
+            "--vectors-dir",
+            file_okay=False,
+            help="Where the vector sidecars are (default: beside inputs).",
+        ),
+    ] = None,
     limit: Annotated[
         int | None,
         typer.Option(
@@ -329,7 +490,7 @@ def upload(
         bool,
         typer.Option(
             "--progress/--no-progress",
-            help="Show a per-graph record progress bar.",
+            help="Show a per-graph progress bar of bytes read.",
         ),
     ] = True,
     log_level: Annotated[
@@ -356,6 +517,25 @@ def upload(
             [path.resolve() for path in inputs],
             batch_size=batch_size,
             upload_batch_size=upload_batch_size,
+            upload_workers=upload_workers,
+            max_unconfirmed=max_unconfirmed,
+            bulk_load=bulk_load,
+            adaptive=(
+                AdaptiveBatching(
+                    min_size=min_batch_size,
+                    max_size=max_batch_size,
+                    target_seconds=batch_seconds,
+                )
+                if adaptive
+                else None
+            ),
+            jobs=jobs,
+            resume=resume,
+            checkpoint_dir=checkpoint_dir,
+            incremental=incremental,
+            vector_cache=vector_cache,
+            vectors=vectors,
+            vectors_dir=vectors_dir,
             limit=limit,
             create_collection=create_collection,
             payload_indexes=payload_indexes,
@@ -375,6 +555,353 @@ def upload(
     )
 
 
+@app.command()
+def index(
+    hdt_file: Annotated[
+        Path,
+        typer.Argument(help="Input HDT graph file."),
+    ],
+    config_toml: Annotated[
+        Path,
+        typer.Argument(help="Indexing TOML config."),
+    ],
+    graph: Annotated[
+        str | None,
+        typer.Option(
+            "--graph",
+            help="Graph name to upload as (default: the HDT file's stem).",
+        ),
+    ] = None,
+    target: Annotated[
+        str | None,
+        typer.Option(
+            "--target",
+            help="Name of one target from the config to materialize.",
+        ),
+    ] = None,
+    limit: Annotated[
+        int | None,
+        typer.Option(
+            "--limit",
+            min=1,
+            help="Maximum number of root nodes to process per target.",
+        ),
+    ] = None,
+    max_iris_per_record: Annotated[
+        int,
+        typer.Option(
+            "--max-iris-per-record",
+            min=1,
+            help="Maximum source IRIs to keep for each grouped output record.",
+        ),
+    ] = 10,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            min=0,
+            help=(
+                "Worker processes for materialization. 1 = single process, "
+                "holding every record in memory; 0 = one per CPU, streaming "
+                "records from temp shards."
+            ),
+        ),
+    ] = 0,
+    chunk_size: Annotated[
+        int,
+        typer.Option(
+            "--chunk-size",
+            min=1,
+            help="Root IRIs handed to each worker task (with --jobs != 1).",
+        ),
+    ] = 1000,
+    batch_size: Annotated[
+        int,
+        typer.Option(
+            "--batch-size",
+            min=1,
+            help="Number of records to embed at once.",
+        ),
+    ] = 256,
+    upload_batch_size: Annotated[
+        int,
+        typer.Option(
+            "--upload-batch-size",
+            min=1,
+            help="Number of embedded points to upsert at once.",
+        ),
+    ] = 256,
+    upload_workers: Annotated[
+        int,
+        typer.Option(
+            "--upload-workers",
+            min=1,
+            help=(
+                "Number of upserts to keep in flight while the next batches "
+                "are merged and embedded."
+            ),
+        ),
+    ] = 4,
+    max_unconfirmed: Annotated[
+        int,
+        typer.Option(
+            "--max-unconfirmed",
+            min=0,
+            help="As for `upload`. 0 waits on every upsert.",
+        ),
+    ] = 0,
+    bulk_load: Annotated[
+        bool,
+        typer.Option(
+            "--bulk-load",
+            help="Defer HNSW indexing while uploading, as for `upload`.",
+        ),
+    ] = False,
+    adaptive: Annotated[
+        bool,
+        typer.Option(
+            "--adaptive",
+            help=(
+                "Adjust --batch-size and --upload-batch-size to take about "
+                "--batch-seconds each, as for `upload`."
+            ),
+        ),
+    ] = False,
+    batch_seconds: Annotated[
+        float,
+        typer.Option(
+            "--batch-seconds",
+            min=0.01,
+            help="Latency budget per embed call or upsert for --adaptive.",
+        ),
+    ] = 1.0,
+    min_batch_size: Annotated[
+        int,
+        typer.Option(
+            "--min-batch-size",
+            min=1,
+            help="Smallest batch size --adaptive may choose.",
+        ),
+    ] = 16,
+    max_batch_size: Annotated[
+        int,
+        typer.Option(
+            "--max-batch-size",
+            min=1,
+            help="Largest batch size --adaptive may choose.",
+        ),
+    ] = 4096,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            "--incremental",
+            help=(
+                "Only embed records whose point is not stored yet or whose "
+                "payload changed, and delete the graph's points that are no "
+                "longer produced "
+                "(unless --limit or --target leave the graph partial)."
+            ),
+        ),
+    ] = False,
+    vector_cache: Annotated[
+        Path | None,
+        typer.Option(
+            "--vector-cache",
+            file_okay=False,
+            help=("Directory of previously embedded vectors, as for `upload`."),
+        ),
+    ] = None,
+    create_collection: Annotated[
+        bool,
+        typer.Option(
+            "--create-collection/--no-create-collection",
+            help="Create the configured collection if it does not exist.",
+        ),
+    ] = False,
+    payload_indexes: Annotated[
+        bool,
+        typer.Option(
+            "--payload-indexes/--no-payload-indexes",
+            help="Create keyword payload indexes for graph and iri.",
+        ),
+    ] = False,
+    dry_run: Annotated[
+        bool,
+        typer.Option(
+            "--dry-run",
+            help="Materialize and embed records without writing to Qdrant.",
+        ),
+    ] = False,
+    progress: Annotated[
+        bool,
+        typer.Option(
+            "--progress/--no-progress",
+            help="Show progress bars of roots materialized and records sent.",
+        ),
+    ] = True,
+    log_level: Annotated[
+        str,
+        typer.Option("--log-level", help="Log level."),
+    ] = "INFO",
+    log_every: Annotated[
+        int,
+        typer.Option(
+            "--log-every",
+            min=1,
+            help="Log an upload progress line after this many records.",
+        ),
+    ] = 10_000,
+):
+    """Textify an HDT graph and upload its records, with no JSONL between.
+
+    Equivalent to `textify --jsonl` followed by `upload`, but the merged
+    records go straight into the embedding and upsert pipeline, so nothing is
+    written out, read back or parsed again. Unlike `upload`, an interrupted
+    run cannot resume: it has no file to checkpoint.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level=log_level.upper())
+
+    config = MaterializationConfiguration.from_toml(config_toml)
+    with ExitStack() as stack:
+        records: Iterable[OutputRecord]
+        if jobs == 1:
+            records = materialize_records(
+                load_graph(hdt_file),
+                config,
+                target=target,
+                limit=limit,
+                max_iris_per_record=max_iris_per_record,
+                progress=progress,
+            )
+        else:
+            shards = stack.enter_context(
+                materialized_shards(
+                    hdt_file,
+                    config_toml,
+                    config,
+                    target=target,
+                    limit=limit,
+                    jobs=jobs,
+                    chunk_size=chunk_size,
+                    progress=progress,
+                )
+            )
+            records = iter_shard_records(
+                shards, max_iris_per_record=max_iris_per_record
+            )
+
+        # Built only once the materialization workers are forked: the
+        # Qdrant client and embedder may start threads, which a fork copies
+        # badly.
+        ctx = AppContext.from_env()
+        try:
+            total = upload_stream(
+                ctx,
+                graph or hdt_file.stem,
+                (asdict(record) for record in records),
+                batch_size=batch_size,
+                upload_batch_size=upload_batch_size,
+                upload_workers=upload_workers,
+                max_unconfirmed=max_unconfirmed,
+                bulk_load=bulk_load,
+                adaptive=(
+                    AdaptiveBatching(
+                        min_size=min_batch_size,
+                        max_size=max_batch_size,
+                        target_seconds=batch_seconds,
+                    )
+                    if adaptive
+                    else None
+                ),
+                incremental=incremental,
+                complete=limit is None and target is None,
+                vector_cache=vector_cache,
+                create_collection=create_collection,
+                payload_indexes=payload_indexes,
+                dry_run=dry_run,
+                progress_enabled=progress,
+                log_every=log_every,
+            )
+        except Exception as e:
+            _fail(friendly_error(e))
+
+    action = "Prepared" if dry_run else "Uploaded"
+    typer.echo(
+        f"{action} {total} points into {ctx.settings.qdrant_collection} "
+        f"at {ctx.settings.qdrant_location}"
+    )
+
+
+@app.command()
+def embed(
+    inputs: Annotated[
+        list[Path],
+        typer.Argument(help="JSONL embedding-record files to embed."),
+    ],
+    output_dir: Annotated[
+        Path | None,
+        typer.Option(
+            "--output-dir",
+            "-o",
+            file_okay=False,
+            help="Where to write the vector sidecars (default: beside inputs).",
+        ),
+    ] = None,
+    batch_size: Annotated[
+        int,
+        typer.Option(
+            "--batch-size",
+            min=1,
+            help="Number of records to embed at once.",
+        ),
+    ] = 256,
+    progress: Annotated[
+        bool,
+        typer.Option(
+            "--progress/--no-progress",
+            help="Show a per-graph record progress bar.",
+        ),
+    ] = True,
+    log_level: Annotated[
+        str,
+        typer.Option("--log-level", help="Log level."),
+    ] = "INFO",
+):
+    """Embed JSONL records into vector sidecars for `upload --vectors`.
+
+    Writes `<input>.vectors.npy`, one float32 row per record in file order,
+    so embedding can run apart from (and ahead of) the upload. Like
+    download-model, this needs no Qdrant connection.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level=log_level.upper())
+
+    settings = load_settings()
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    for path in inputs:
+        if not path.exists():
+            _fail(f"Input file not found: {path}")
+
+    try:
+        embedder = make_embedder(settings)
+        for path in inputs:
+            output = vectors_path(path, output_dir)
+            rows = embed_file(
+                embedder,
+                path,
+                output,
+                batch_size=batch_size,
+                model_name=settings.model_name,
+                progress_enabled=progress,
+            )
+            typer.echo(f"Embedded {rows} records of {path} into {output}")
+    except Exception as e:
+        _fail(friendly_error(e))
+
+
 @app.command("download-model")
 def download_model():
     """Ensure the configured embedding model is in the local cache.
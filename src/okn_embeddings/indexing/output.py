@@ -3,6 +3,8 @@ from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Iterable
 
+from .compression import open_text_writer
+
 
 @dataclass
 class OutputRecord:
@@ -25,11 +27,11 @@ class WorkerRecord:
     iri: str
     label: str
     embedding_text: str
-    digest: str
+    digest: bytes
 
 
 def write_json(records: Iterable[OutputRecord], output_path: Path):
-    with output_path.open("w", encoding="utf-8") as f:
+    with open_text_writer(output_path) as f:
         json.dump(
             [asdict(r) for r in records],
             f,
@@ -48,7 +50,7 @@ def write_json_record(record: OutputRecord, f, first: bool) -> bool:
 
 
 def write_jsonl(records: Iterable[OutputRecord], output_path: Path):
-    with output_path.open("w", encoding="utf-8") as f:
+    with open_text_writer(output_path) as f:
         for record in records:
             write_jsonl_record(record, f)
 
@@ -59,7 +61,7 @@ def write_jsonl_record(record: OutputRecord, f) -> None:
 
 
 def write_text(records: Iterable[OutputRecord], output_path: Path):
-    with output_path.open("w", encoding="utf-8") as f:
+    with open_text_writer(output_path) as f:
         for record in records:
             write_text_record(record, f)
 
@@ -1,17 +1,19 @@
-import json
+import io
 import multiprocessing
 import os
-from collections import defaultdict
+import struct
+from collections import defaultdict, deque
 from contextlib import contextmanager
-from dataclasses import asdict
 from functools import partial
 from itertools import islice
+from multiprocessing.pool import AsyncResult, Pool
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Iterable
+from typing import Callable, Iterable, Iterator, NamedTuple, TextIO, TypeVar
 
 from tqdm import tqdm
 
+from .compression import open_text_writer
 from .models import GraphConfiguration, MaterializationConfiguration
 from .output import (
     OutputRecord,
@@ -33,7 +35,18 @@ from .textify import (
 # sharding its records to temp files by text-digest so identical text lands in
 # one shard. The parent then merges one shard at a time and streams the output,
 # keeping its memory bounded to a single shard rather than the whole
-# (potentially multi-GB) record set.
+# (potentially multi-GB) record set. Merging runs on the same pool, a shard
+# per task, so the parent only concatenates merged shards in order and holds
+# no more of them at once than there are workers.
+#
+# Every root passes through a shard, so shard records are a flat binary
+# format rather than JSON: the raw 32-byte digest and the byte lengths of the
+# IRI, label and text, then those three UTF-8 strings. Encoding is a struct
+# pack and a few `encode`s, decoding slices one read of the whole file.
+
+_SHARD_HEADER = struct.Struct("<32sIII")
+
+T = TypeVar("T")
 
 _WORKER_TEXTIFIER: Textifier | None = None
 _WORKER_TARGET_CONFIGS: dict[str, GraphConfiguration] = {}
@@ -67,8 +80,37 @@ def chunked(iterable: Iterable[str], size: int) -> Iterable[list[str]]:
         yield chunk
 
 
-def shard_for_digest(digest: str, shard_count: int) -> int:
-    return int(digest[:8], 16) % shard_count
+def shard_for_digest(digest: bytes, shard_count: int) -> int:
+    return int.from_bytes(digest[:4], "big") % shard_count
+
+
+def encode_shard_record(record: WorkerRecord) -> bytes:
+    iri = record.iri.encode("utf-8")
+    label = record.label.encode("utf-8")
+    text = record.embedding_text.encode("utf-8")
+    header = _SHARD_HEADER.pack(record.digest, len(iri), len(label), len(text))
+    return b"".join((header, iri, label, text))
+
+
+def iter_shard_file(path: Path) -> Iterator[WorkerRecord]:
+    data = path.read_bytes()
+    view = memoryview(data)
+    offset = 0
+    while offset < len(data):
+        digest, iri_len, label_len, text_len = _SHARD_HEADER.unpack_from(
+            data, offset
+        )
+        offset += _SHARD_HEADER.size
+        iri_end = offset + iri_len
+        label_end = iri_end + label_len
+        text_end = label_end + text_len
+        yield WorkerRecord(
+            iri=str(view[offset:iri_end], "utf-8"),
+            label=str(view[iri_end:label_end], "utf-8"),
+            embedding_text=str(view[label_end:text_end], "utf-8"),
+            digest=digest,
+        )
+        offset = text_end
 
 
 def _init_worker(hdt_file: Path, config_toml: Path) -> None:
@@ -95,21 +137,17 @@ def _materialize_chunk_to_shards(
         raise RuntimeError("materialization worker was not initialized")
 
     target_config = _WORKER_TARGET_CONFIGS[target_name]
-    rows_by_shard: defaultdict[int, list[str]] = defaultdict(list)
+    rows_by_shard: defaultdict[int, list[bytes]] = defaultdict(list)
     for iri in iris:
         record = textifier.materialize_one(iri, target_config)
         shard = shard_for_digest(record.digest, shard_count)
-        rows_by_shard[shard].append(
-            json.dumps(asdict(record), ensure_ascii=False)
-        )
+        rows_by_shard[shard].append(encode_shard_record(record))
 
     pid = os.getpid()
     for shard, rows in rows_by_shard.items():
-        path = Path(temp_dir) / f"shard-{shard:04d}-{pid}.jsonl"
-        with path.open("a", encoding="utf-8") as f:
-            for row in rows:
-                f.write(row)
-                f.write("\n")
+        path = Path(temp_dir) / f"shard-{shard:04d}-{pid}.bin"
+        with path.open("ab") as f:
+            f.write(b"".join(rows))
 
     return len(iris)
 
@@ -119,40 +157,48 @@ def _grouped_records_from_shard(
     shard: int,
     max_iris_per_record: int,
 ) -> list[OutputRecord]:
-    by_digest: dict[str, OutputRecord] = {}
-    for path in sorted(temp_dir.glob(f"shard-{shard:04d}-*.jsonl")):
-        with path.open("r", encoding="utf-8") as f:
-            for line in f:
-                merge_worker_record(
-                    by_digest,
-                    WorkerRecord(**json.loads(line)),
-                    max_iris_per_record=max_iris_per_record,
-                )
+    by_digest: dict[bytes, OutputRecord] = {}
+    for path in sorted(temp_dir.glob(f"shard-{shard:04d}-*.bin")):
+        for record in iter_shard_file(path):
+            merge_worker_record(
+                by_digest, record, max_iris_per_record=max_iris_per_record
+            )
     records = finish_records(by_digest)
     warn_truncated_records(records, max_iris_per_record=max_iris_per_record)
     return records
 
 
-def materialize_records_to_path(
+class MaterializedShards(NamedTuple):
+    """Shard files in `directory`, and the worker pool that wrote them."""
+
+    directory: Path
+    pool: Pool
+    workers: int
+    shard_count: int
+
+
+@contextmanager
+def materialized_shards(
     hdt_file: Path,
     config_toml: Path,
     config: MaterializationConfiguration,
-    output_path: Path,
     *,
-    text: bool = False,
-    jsonl: bool = False,
     target: str | None = None,
     limit: int | None = None,
     jobs: int = 0,
     chunk_size: int = 1000,
     progress: bool = False,
-    max_iris_per_record: int = 10,
     shard_count: int = 256,
-) -> int:
+) -> Iterator[MaterializedShards]:
+    """Materialize every root into digest shards in a temp directory.
+
+    Yields once every root is in a shard, with the pool still up so that the
+    shards can be merged on it (see `iter_shard_records`); the pool and the
+    directory are removed afterwards.
+    """
     reader = graph_reader(load_graph(hdt_file))
     worker_count = multiprocessing.cpu_count() if jobs == 0 else jobs
 
-    output_count = 0
     with TemporaryDirectory(prefix="okn-textify-") as temp_name:
         temp_dir = Path(temp_name)
         with multiprocessing.Pool(
@@ -185,28 +231,159 @@ def materialize_records_to_path(
                     if bar is not None:
                         bar.close()
 
-        shard_iter: Iterable[int] = range(shard_count)
-        if progress:
-            shard_iter = tqdm(shard_iter, desc="merge", unit=" shards")
-
-        with output_path.open("w", encoding="utf-8") as f:
-            first = True
-            if not text and not jsonl:
-                f.write("[")
-            for shard in shard_iter:
-                for record in _grouped_records_from_shard(
-                    temp_dir, shard, max_iris_per_record
-                ):
-                    if text:
-                        write_text_record(record, f)
-                    elif jsonl:
-                        write_jsonl_record(record, f)
-                    else:
-                        first = write_json_record(record, f, first)
-                    output_count += 1
-            if not text and not jsonl:
-                if not first:
-                    f.write("\n")
-                f.write("]")
+            yield MaterializedShards(temp_dir, pool, worker_count, shard_count)
+
+
+def _merge_shard(
+    temp_dir: str, max_iris_per_record: int, shard: int
+) -> list[OutputRecord]:
+    return _grouped_records_from_shard(
+        Path(temp_dir), shard, max_iris_per_record
+    )
+
+
+def _format_shard(
+    temp_dir: str,
+    max_iris_per_record: int,
+    text: bool,
+    jsonl: bool,
+    shard: int,
+) -> tuple[int, str]:
+    """Merge a shard and render its records as output text.
+
+    JSON records come out as array elements each led by a separator, the
+    first by a bare newline; the parent puts a comma before every chunk but
+    the first non-empty one, which gives the same text a serial merge would.
+    """
+    records = _grouped_records_from_shard(
+        Path(temp_dir), shard, max_iris_per_record
+    )
+    f = io.StringIO()
+    first = True
+    for record in records:
+        if text:
+            write_text_record(record, f)
+        elif jsonl:
+            write_jsonl_record(record, f)
+        else:
+            first = write_json_record(record, f, first)
+    return len(records), f.getvalue()
+
+
+def _merged_in_order(
+    shards: MaterializedShards,
+    worker: Callable[[int], T],
+    progress: bool,
+) -> Iterator[T]:
+    """Run `worker` on every shard over the pool, yielding in shard order.
+
+    At most one shard per worker is queued or waiting to be taken, so the
+    parent never holds more than that many merged shards, however far the
+    workers get ahead of whatever is consuming them.
+    """
+    pending: deque[AsyncResult[T]] = deque()
+    with tqdm(
+        total=shards.shard_count,
+        desc="merge",
+        unit=" shards",
+        disable=not progress,
+    ) as bar:
+        for shard in range(shards.shard_count):
+            pending.append(shards.pool.apply_async(worker, (shard,)))
+            if len(pending) > shards.workers:
+                yield pending.popleft().get()
+                bar.update()
+        while pending:
+            yield pending.popleft().get()
+            bar.update()
 
+
+def iter_shard_records(
+    shards: MaterializedShards,
+    *,
+    max_iris_per_record: int = 10,
+    progress: bool = False,
+) -> Iterator[OutputRecord]:
+    """Merge the shards over the pool, yielding their grouped records."""
+    worker = partial(_merge_shard, str(shards.directory), max_iris_per_record)
+    for records in _merged_in_order(shards, worker, progress):
+        yield from records
+
+
+def write_merged_shards(
+    shards: MaterializedShards,
+    f: TextIO,
+    *,
+    text: bool = False,
+    jsonl: bool = False,
+    max_iris_per_record: int = 10,
+    progress: bool = False,
+) -> int:
+    """Merge the shards over the pool into `f`. Returns the record count.
+
+    Workers merge and render whole shards; this only concatenates them.
+    """
+    worker = partial(
+        _format_shard,
+        str(shards.directory),
+        max_iris_per_record,
+        text,
+        jsonl,
+    )
+    output_count = 0
+    first = True
+    if not text and not jsonl:
+        f.write("[")
+    for count, chunk in _merged_in_order(shards, worker, progress):
+        if not count:
+            continue
+        if not text and not jsonl and not first:
+            f.write(",")
+        f.write(chunk)
+        first = False
+        output_count += count
+    if not text and not jsonl:
+        if not first:
+            f.write("\n")
+        f.write("]")
     return output_count
+
+
+def materialize_records_to_path(
+    hdt_file: Path,
+    config_toml: Path,
+    config: MaterializationConfiguration,
+    output_path: Path,
+    *,
+    text: bool = False,
+    jsonl: bool = False,
+    target: str | None = None,
+    limit: int | None = None,
+    jobs: int = 0,
+    chunk_size: int = 1000,
+    progress: bool = False,
+    max_iris_per_record: int = 10,
+    shard_count: int = 256,
+) -> int:
+    with (
+        materialized_shards(
+            hdt_file,
+            config_toml,
+            config,
+            target=target,
+            limit=limit,
+            jobs=jobs,
+            chunk_size=chunk_size,
+            progress=progress,
+            shard_count=shard_count,
+        ) as shards,
+        open_text_writer(output_path) as f,
+    ):
+        return write_merged_shards(
+            shards,
+            f,
+            text=text,
+            jsonl=jsonl,
+            max_iris_per_record=max_iris_per_record,
+            progress=progress,
+        )
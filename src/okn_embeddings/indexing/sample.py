@@ -49,9 +49,7 @@ def graph_seed(graph: Graph) -> int:
     return int.from_bytes(digest[:8], "big")
 
 
-def reservoir_sample(
-    items: Iterable[T], k: int, rng: random.Random
-) -> list[T]:
+def reservoir_sample(items: Iterable[T], k: int, rng: random.Random) -> list[T]:
     """A uniform `k`-sample of `items`, whose length need not be known.
 
     Vitter's Algorithm R: keep the first k, then admit the i-th item with
@@ -351,7 +349,7 @@ def sample_targets(
             reader.root_iris(target_config.type), limit, rng
         )
 
-        by_digest: dict[str, OutputRecord] = {}
+        by_digest: dict[bytes, OutputRecord] = {}
         for iri in sorted(roots):
             merge_worker_record(
                 by_digest, textifier.materialize_one(iri, target_config)
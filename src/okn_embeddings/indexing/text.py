@@ -48,5 +48,6 @@ def stable_score(root: Any, pred: Any, obj: Any) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
-def text_digest(text: str) -> str:
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+def text_digest(text: str) -> bytes:
+    """The raw 32-byte sha256 of a text, for grouping identical texts."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
@@ -277,7 +277,7 @@ class Textifier:
 
 
 def merge_worker_record(
-    by_digest: dict[str, OutputRecord],
+    by_digest: dict[bytes, OutputRecord],
     record: WorkerRecord,
     max_iris_per_record: int = 10,
 ) -> None:
@@ -319,7 +319,7 @@ def warn_truncated_records(
             )
 
 
-def finish_records(by_digest: dict[str, OutputRecord]) -> list[OutputRecord]:
+def finish_records(by_digest: dict[bytes, OutputRecord]) -> list[OutputRecord]:
     records = list(by_digest.values())
     return sorted(records, key=lambda r: (r.embedding_text, r.iris))
 
@@ -343,7 +343,7 @@ def materialize_records(
     reader = graph_reader(graph)
     textifier = Textifier(reader, config)
 
-    by_digest: dict[str, OutputRecord] = {}
+    by_digest: dict[bytes, OutputRecord] = {}
 
     for target_name, target_config in target_config_items(config, target):
         root_iter = reader.root_iris(target_config.type)
@@ -5,55 +5,150 @@ embedding records, and this module embeds each record's `embedding_text`
 through the shared `core.embedding` seam (so stored vectors match the query
 path) and upserts the points.
 
-Each input file is one graph (`graph = path.stem`). Point IDs are derived
+Each input file is one graph, named by the file without its extensions
+(`my-graph.jsonl.zst` -> `my-graph`; see `compression`). Point IDs are derived
 deterministically from `(graph, iri, embedding_text)`, so re-running upserts in
 place rather than duplicating.
+
+`upload_records` runs as a three-stage pipeline so that parsing, embedding and
+network I/O overlap: a reader thread parses JSONL batches ahead into a bounded
+queue, the calling thread embeds them, and a small thread pool keeps several
+upserts in flight. Both hand-offs are bounded, so a slow stage applies
+backpressure instead of buffering the file in memory. The reader can be any
+record source: `upload_stream` takes records straight from textify, with no
+file in between.
 """
 
-import json
+import hashlib
+import queue
+import threading
+import time
 import uuid
+from collections import deque
+from concurrent.futures import (
+    FIRST_EXCEPTION,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import nullcontext
+from dataclasses import replace
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, TypeVar
 
+import numpy as np
+import orjson
 from loguru import logger
 from qdrant_client.models import (
+    CollectionStatus,
     Distance,
+    FieldCondition,
+    Filter,
+    HnswConfigDiff,
+    MatchValue,
+    OptimizersConfigDiff,
     PayloadSchemaType,
+    PointIdsList,
     PointStruct,
+    UpdateResult,
     VectorParams,
 )
 from tqdm import tqdm
 
 from ..config import AppContext
+from ..core.embedding import Embedder
+from ..core.result_cache import UPLOAD_GENERATION_KEY
+from .adaptive import AdaptiveBatching, BatchSizeController
+from .checkpoint import (
+    UploadCheckpoint,
+    checkpoint_path,
+    fingerprint,
+    load_checkpoint,
+    save_checkpoint,
+)
+from .compression import graph_name, is_compressed, open_binary_reader
+from .vector_cache import VectorCache, VectorCachingEmbedder
+from .vectors import open_vectors, vectors_path, write_manifest
 
 POINT_ID_NAMESPACE = uuid.UUID("223675f1-af1e-4ce9-b7b6-849178e8c69e")
 
+# How many parsed record batches the reader thread may run ahead of embedding.
+PREFETCH_BATCHES = 4
+# Page size for scrolling a graph's point ids and for deleting stale ones.
+ID_PAGE_SIZE = 10_000
+# Payload key holding a hash of the rest of the payload, so an incremental
+# upload can tell an unchanged point from one whose IRIs or label changed.
+CONTENT_HASH_KEY = "content_hash"
+# Collection metadata key holding the index settings a bulk load replaced.
+BULK_LOAD_KEY = "bulk_load_restore"
+# Qdrant's indexing threshold (KB) for a collection that does not set one;
+# what a bulk load restores then, since restoring "unset" changes nothing.
+DEFAULT_INDEXING_THRESHOLD = 10_000
+# How often to poll the collection status while waiting for indexing, and
+# for how long before giving up on it.
+OPTIMIZE_POLL_SECONDS = 5.0
+OPTIMIZE_TIMEOUT_SECONDS = 6 * 60 * 60.0
+
+T = TypeVar("T")
+
+
+class JsonlPosition(NamedTuple):
+    """How far a JSONL reader has got, just past some record."""
+
+    line: int
+    offset: int
+    # Records (non-blank lines) read so far; this record's row is `read - 1`.
+    read: int
+
 
 def iter_jsonl(
     path: Path,
     limit: int | None = None,
 ) -> Iterable[dict[str, Any]]:
     """Yield each JSON object from a JSONL file, with line-numbered errors."""
-    with path.open("r", encoding="utf-8") as f:
-        for idx, line in enumerate(f, start=1):
-            if limit is not None and idx > limit:
+    for _, record in iter_jsonl_positions(path, limit=limit):
+        yield record
+
+
+def iter_jsonl_positions(
+    path: Path,
+    limit: int | None = None,
+    *,
+    line: int = 0,
+    offset: int = 0,
+    read: int = 0,
+) -> Iterable[tuple[JsonlPosition, dict[str, Any]]]:
+    """Like `iter_jsonl`, also yielding the position after each record.
+
+    Reading starts at byte `offset`, which is taken to be the start of line
+    `line + 1` after `read` records; that is how a checkpointed upload
+    resumes mid-file.
+    """
+    with open_binary_reader(path, offset) as f:
+        for raw in f:
+            line += 1
+            offset += len(raw)
+            if limit is not None and line > limit:
                 break
-            line = line.strip()
-            if not line:
+            raw = raw.strip()
+            if not raw:
                 continue
             try:
-                record = json.loads(line)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"{path}:{idx}: invalid JSON: {e}") from e
+                # orjson parses bytes directly, several times faster than
+                # json.loads on these records; it rejects invalid UTF-8 too.
+                record = orjson.loads(raw)
+            except orjson.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line}: invalid JSON: {e}") from e
             if not isinstance(record, dict):
-                raise ValueError(f"{path}:{idx}: expected a JSON object")
-            yield record
+                raise ValueError(f"{path}:{line}: expected a JSON object")
+            read += 1
+            yield JsonlPosition(line, offset, read), record
 
 
 def count_jsonl(path: Path, limit: int | None = None) -> int:
-    """Count non-empty lines, so the progress bar knows its total up front."""
+    """Count non-empty lines, e.g. to size a vector sidecar up front."""
     count = 0
-    with path.open("r", encoding="utf-8") as f:
+    with open_binary_reader(path) as f:
         for line in f:
             if line.strip():
                 count += 1
@@ -62,18 +157,70 @@ def count_jsonl(path: Path, limit: int | None = None) -> int:
     return count
 
 
-def chunks(records: Iterable[dict[str, Any]], size: int):
-    """Group an iterable of records into lists of at most `size`."""
-    batch: list[dict[str, Any]] = []
+def chunks(
+    records: Iterable[T], size: int | Callable[[], int]
+) -> Iterator[list[T]]:
+    """Group an iterable of records into lists of at most `size`.
+
+    `size` may be a callable, read afresh for each batch, so that a batch
+    size can change while the records are being consumed.
+    """
+    batch_size = size if callable(size) else lambda: size
+    batch: list[T] = []
     for record in records:
         batch.append(record)
-        if len(batch) == size:
+        if len(batch) >= batch_size():
             yield batch
             batch = []
     if batch:
         yield batch
 
 
+def prefetch(items: Iterable[T], depth: int) -> Iterator[T]:
+    """Iterate `items` on a background thread, at most `depth` items ahead.
+
+    Exceptions raised while producing are re-raised to the consumer. If the
+    consumer stops early, the producer thread is told to stop and exits at its
+    next item instead of reading on to the end.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((done, e))
+            return
+        put((done, None))
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
 def point_id(graph: str, record: dict[str, Any]) -> str:
     """A stable UUID5 for a record, so re-uploads upsert in place."""
     iris = record.get("iris")
@@ -107,15 +254,19 @@ def payload_for_record(graph: str, record: dict[str, Any]) -> dict[str, Any]:
     if "repr" not in payload and "embedding_text" in record:
         payload["repr"] = record["embedding_text"]
 
+    payload[CONTENT_HASH_KEY] = content_hash(payload)
     return payload
 
 
-def points_for_batch(
-    ctx: AppContext,
-    graph: str,
-    records: list[dict[str, Any]],
-) -> list[PointStruct]:
-    """Embed a batch of records and turn them into Qdrant points."""
+def content_hash(payload: dict[str, Any]) -> str:
+    """A hash of everything in a payload except its own `content_hash`."""
+    content = {k: v for k, v in payload.items() if k != CONTENT_HASH_KEY}
+    data = orjson.dumps(content, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(data).hexdigest()
+
+
+def record_texts(graph: str, records: list[dict[str, Any]]) -> list[str]:
+    """Each record's `embedding_text`, which must be a non-empty string."""
     texts: list[str] = []
     for record in records:
         text = record.get("embedding_text")
@@ -124,19 +275,96 @@ def points_for_batch(
                 f"{graph}: record is missing non-empty embedding_text"
             )
         texts.append(text)
+    return texts
+
+
+def points_for_batch(
+    ctx: AppContext,
+    graph: str,
+    records: list[dict[str, Any]],
+    vectors: list[np.ndarray] | None = None,
+) -> list[PointStruct]:
+    """Embed a batch of records and turn them into Qdrant points.
 
-    vectors = ctx.embedder.embed_many(texts)
+    `vectors`, if given, are the records' vectors computed ahead of time
+    (see `indexing.vectors`), and nothing is embedded.
+    """
+    texts = record_texts(graph, records)
+    if vectors is None:
+        vectors = ctx.embedder.embed_many(texts)
+
+    # The client wants float lists; one conversion of the stacked batch is
+    # cheaper than one per vector.
+    rows = np.asarray(vectors, dtype=np.float32).tolist()
 
     return [
         PointStruct(
             id=point_id(graph, record),
-            vector=vector.tolist(),
+            vector=row,
             payload=payload_for_record(graph, record),
         )
-        for record, vector in zip(records, vectors, strict=True)
+        for record, row in zip(records, rows, strict=True)
     ]
 
 
+def embed_file(
+    embedder: Embedder,
+    path: Path,
+    output: Path,
+    *,
+    batch_size: int,
+    model_name: str,
+    progress_enabled: bool,
+) -> int:
+    """Embed every record of a file into a vector sidecar at `output`.
+
+    Row i of the sidecar is the vector of the file's i-th record (see
+    `indexing.vectors`). Written under a temporary name and renamed into
+    place, so an interrupted run never leaves a sidecar that looks complete.
+    Returns the number of rows.
+    """
+    graph = graph_name(path)
+    total_records = count_jsonl(path)
+    dim = int(embedder.embed("dimension probe").shape[0])
+    logger.info(
+        "embedding graph={} file={} records={} into {}",
+        graph,
+        path,
+        total_records,
+        output,
+    )
+
+    tmp = output.with_name(output.name + ".tmp")
+    matrix = np.lib.format.open_memmap(
+        tmp, mode="w+", dtype=np.float32, shape=(total_records, dim)
+    )
+    progress = tqdm(
+        total=total_records,
+        desc=graph,
+        unit="record",
+        disable=not progress_enabled,
+        dynamic_ncols=True,
+    )
+    row = 0
+    batches = prefetch(chunks(iter_jsonl(path), batch_size), PREFETCH_BATCHES)
+    try:
+        for batch in batches:
+            texts = record_texts(graph, batch)
+            matrix[row : row + len(texts)] = embedder.embed_many(texts)
+            row += len(texts)
+            progress.update(len(texts))
+    finally:
+        batches.close()
+        progress.close()
+    matrix.flush()
+    del matrix
+
+    tmp.replace(output)
+    write_manifest(path, output, model_name, row)
+    logger.info("finished graph={} rows={}", graph, row)
+    return row
+
+
 def ensure_collection(ctx: AppContext, create_if_missing: bool) -> None:
     """Verify (or create) the configured collection before uploading."""
     collection = ctx.settings.qdrant_collection
@@ -178,6 +406,168 @@ def ensure_payload_indexes(ctx: AppContext) -> None:
         )
 
 
+def begin_bulk_load(ctx: AppContext) -> dict[str, int]:
+    """Defer HNSW indexing until `end_bulk_load`; returns what to restore.
+
+    Streaming points into an indexed collection makes Qdrant rebuild index
+    segments over and over during a full load. With `m=0` and an indexing
+    threshold of 0, it only stores the vectors; the graph is built once, at
+    the end. The settings being replaced are saved in the collection's
+    metadata first, so a load that was killed outright is still restored to
+    them (not to `m=0`) by the next bulk load.
+    """
+    collection = ctx.settings.qdrant_collection
+    config = ctx.client.get_collection(collection).config
+    restore = (config.metadata or {}).get(BULK_LOAD_KEY)
+    if restore is None:
+        threshold = config.optimizer_config.indexing_threshold
+        restore = {
+            "m": config.hnsw_config.m,
+            "indexing_threshold": (
+                DEFAULT_INDEXING_THRESHOLD if threshold is None else threshold
+            ),
+        }
+        ctx.client.update_collection(
+            collection_name=collection, metadata={BULK_LOAD_KEY: restore}
+        )
+    else:
+        logger.warning("resuming an unfinished bulk load of {}", collection)
+
+    ctx.client.update_collection(
+        collection_name=collection,
+        hnsw_config=HnswConfigDiff(m=0),
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=0),
+    )
+    logger.info("deferred indexing of {} for a bulk load", collection)
+    return restore
+
+
+def end_bulk_load(
+    ctx: AppContext,
+    restore: dict[str, int],
+    wait: bool = True,
+    timeout: float = OPTIMIZE_TIMEOUT_SECONDS,
+) -> None:
+    """Restore the index settings `begin_bulk_load` replaced.
+
+    With `wait`, block until Qdrant has finished building the index, so the
+    collection is fully searchable when the upload reports success. Raises
+    RuntimeError if the collection goes red (an optimizer failed), and
+    TimeoutError if it is still indexing after `timeout` seconds; the index
+    settings are restored either way.
+    """
+    collection = ctx.settings.qdrant_collection
+    ctx.client.update_collection(
+        collection_name=collection,
+        hnsw_config=HnswConfigDiff(m=restore["m"]),
+        optimizers_config=OptimizersConfigDiff(
+            indexing_threshold=restore["indexing_threshold"]
+        ),
+    )
+    ctx.client.update_collection(
+        collection_name=collection, metadata={BULK_LOAD_KEY: None}
+    )
+    logger.info("restored indexing of {}: {}", collection, restore)
+    if not wait:
+        return
+
+    deadline = time.monotonic() + timeout
+    while True:
+        info = ctx.client.get_collection(collection)
+        if info.status == CollectionStatus.GREEN:
+            break
+        if info.status == CollectionStatus.RED:
+            # An optimizer failure carries its message; "ok" does not.
+            error = getattr(info.optimizer_status, "error", None)
+            raise RuntimeError(
+                f"indexing {collection} failed: {error or 'status is red'}"
+            )
+        if time.monotonic() >= deadline:
+            raise TimeoutError(
+                f"{collection} is still indexing after {timeout:.0f}s "
+                f"({info.indexed_vectors_count}/{info.points_count} indexed); "
+                "Qdrant keeps building the index in the background"
+            )
+        logger.info(
+            "waiting for {} to index: status={} indexed={}/{}",
+            collection,
+            info.status,
+            info.indexed_vectors_count,
+            info.points_count,
+        )
+        time.sleep(OPTIMIZE_POLL_SECONDS)
+    logger.info("finished indexing {}", collection)
+
+
+def mark_upload_generation(ctx: AppContext) -> None:
+    """Stamp the collection as changed, so cached search results expire.
+
+    Upserting changed records in place need not change `points_count`, so
+    the result cache keys on this marker too (see `core.result_cache`).
+    """
+    ctx.client.update_collection(
+        collection_name=ctx.settings.qdrant_collection,
+        metadata={UPLOAD_GENERATION_KEY: uuid.uuid4().hex},
+    )
+
+
+class UploadCancelled(Exception):
+    """Raised by `upload_file` when asked to stop before the file is done."""
+
+
+def graph_point_hashes(ctx: AppContext, graph: str) -> dict[str, str | None]:
+    """Every point id stored for `graph`, with its payload's content hash.
+
+    Points stored before payloads carried a hash map to None.
+    """
+    collection = ctx.settings.qdrant_collection
+    if not ctx.client.collection_exists(collection):
+        return {}
+
+    hashes: dict[str, str | None] = {}
+    offset = None
+    while True:
+        points, offset = ctx.client.scroll(
+            collection_name=collection,
+            scroll_filter=Filter(
+                must=[
+                    FieldCondition(key="graph", match=MatchValue(value=graph))
+                ]
+            ),
+            limit=ID_PAGE_SIZE,
+            offset=offset,
+            with_payload=[CONTENT_HASH_KEY],
+            with_vectors=False,
+        )
+        hashes.update(
+            (str(point.id), (point.payload or {}).get(CONTENT_HASH_KEY))
+            for point in points
+        )
+        if offset is None:
+            return hashes
+
+
+def delete_points(ctx: AppContext, ids: list[str]) -> None:
+    for start in range(0, len(ids), ID_PAGE_SIZE):
+        ctx.client.delete(
+            collection_name=ctx.settings.qdrant_collection,
+            points_selector=PointIdsList(
+                points=list(ids[start : start + ID_PAGE_SIZE])
+            ),
+            wait=True,
+        )
+
+
+def upsert_points(
+    ctx: AppContext, points: list[PointStruct], wait: bool = True
+) -> UpdateResult:
+    return ctx.client.upsert(
+        collection_name=ctx.settings.qdrant_collection,
+        points=points,
+        wait=wait,
+    )
+
+
 def upload_file(
     ctx: AppContext,
     path: Path,
@@ -188,65 +578,485 @@ def upload_file(
     dry_run: bool,
     progress_enabled: bool,
     log_every: int,
+    upload_workers: int = 1,
+    resume: bool = False,
+    checkpoint_dir: Path | None = None,
+    incremental: bool = False,
+    upsert_pool: ThreadPoolExecutor | None = None,
+    stop: threading.Event | None = None,
+    vectors: bool = False,
+    vectors_dir: Path | None = None,
+    adaptive: AdaptiveBatching | None = None,
+    max_unconfirmed: int = 0,
 ) -> int:
-    """Embed and upsert one graph file. Returns the number of points handled."""
-    graph = path.stem
-    uploaded = 0
-    total_records = count_jsonl(path, limit=limit)
+    """Embed and upsert one graph file. Returns the number of points handled.
+
+    The file's records go through `upload_records`, which acknowledges
+    upserts in the order they were sent, so `uploaded` only ever counts a
+    contiguous prefix of the file. With `resume` or a `checkpoint_dir`, a
+    checkpoint of that prefix is saved after each one (beside the file unless
+    `checkpoint_dir` says where); otherwise nothing is written, so inputs can
+    sit somewhere read-only. With `resume`, a matching checkpoint is picked
+    up and the file is read from there; the checkpoint is removed once the
+    whole file is uploaded.
+
+    With `incremental`, records before a resumed checkpoint count as seen, so
+    their points are not deleted as stale.
+
+    With `vectors`, each record's vector is read from the file's sidecar
+    (written by `embed_file`, found beside it or in `vectors_dir`) and
+    nothing is embedded.
+
+    The remaining options are `upload_records`'.
+    """
+    graph = graph_name(path)
+    start = UploadCheckpoint(fingerprint="")
+    checkpoint_file = None
+    if not dry_run and (resume or checkpoint_dir is not None):
+        if checkpoint_dir is not None:
+            checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        checkpoint_file = checkpoint_path(path, checkpoint_dir)
+        start = UploadCheckpoint(fingerprint=fingerprint(ctx, path))
+        saved = None
+        if resume:
+            saved = load_checkpoint(checkpoint_file, start.fingerprint)
+            if saved is None:
+                logger.info("no checkpoint to resume graph={} from", graph)
+        if saved is not None:
+            start = saved
+            logger.info(
+                "resuming graph={} after record={} line={}",
+                graph,
+                start.records,
+                start.line,
+            )
+
+    # The file is read once, so the progress total is its size in bytes, not
+    # a record count that would take a separate pass to find. Positions count
+    # decompressed bytes, so a compressed file's size is no total for them.
+    total_bytes = None if is_compressed(path) else path.stat().st_size
+    sidecar = None
+    if vectors:
+        sidecar = open_vectors(
+            path, vectors_path(path, vectors_dir), ctx.settings.model_name
+        )
+
+    seen: set[str] = set()
+    if incremental:
+        # Records before a resumed checkpoint were read by the earlier run.
+        seen.update(
+            point_id(graph, record)
+            for _, record in iter_jsonl_positions(path, limit=start.line)
+        )
+    logger.info("reading graph={} file={} bytes={}", graph, path, total_bytes)
+
+    def save(position: JsonlPosition, uploaded: int) -> None:
+        assert checkpoint_file is not None
+        save_checkpoint(
+            checkpoint_file,
+            UploadCheckpoint(
+                start.fingerprint,
+                offset=position.offset,
+                line=position.line,
+                read=position.read,
+                records=uploaded,
+            ),
+        )
+
+    progress = tqdm(
+        total=total_bytes,
+        initial=start.offset,
+        desc=graph,
+        unit="B",
+        unit_scale=True,
+        disable=not progress_enabled,
+        dynamic_ncols=True,
+    )
+    records = iter_jsonl_positions(
+        path,
+        limit=limit,
+        line=start.line,
+        offset=start.offset,
+        read=start.read,
+    )
+    uploaded = upload_records(
+        ctx,
+        graph,
+        records,
+        batch_size=batch_size,
+        upload_batch_size=upload_batch_size,
+        dry_run=dry_run,
+        progress=progress,
+        log_every=log_every,
+        upload_workers=upload_workers,
+        uploaded=start.records,
+        checkpoint=save if checkpoint_file is not None else None,
+        incremental=incremental,
+        complete=limit is None,
+        seen=seen,
+        upsert_pool=upsert_pool,
+        stop=stop,
+        sidecar=sidecar,
+        adaptive=adaptive,
+        max_unconfirmed=max_unconfirmed,
+    )
+
+    if checkpoint_file is not None:
+        checkpoint_file.unlink(missing_ok=True)
+    progress.close()
+    return uploaded
+
+
+def stream_positions(
+    records: Iterable[dict[str, Any]],
+) -> Iterator[tuple[JsonlPosition, dict[str, Any]]]:
+    """Position records that come from memory rather than a file.
+
+    A stream has no lines or bytes, so every field counts records, and a
+    progress bar over the offsets counts records too.
+    """
+    for read, record in enumerate(records, 1):
+        yield JsonlPosition(read, read, read), record
+
+
+def upload_records(
+    ctx: AppContext,
+    graph: str,
+    records: Iterable[tuple[JsonlPosition, dict[str, Any]]],
+    *,
+    batch_size: int,
+    upload_batch_size: int,
+    dry_run: bool,
+    progress: tqdm,
+    log_every: int,
+    upload_workers: int = 1,
+    uploaded: int = 0,
+    checkpoint: Callable[[JsonlPosition, int], None] | None = None,
+    incremental: bool = False,
+    complete: bool = True,
+    seen: set[str] | None = None,
+    upsert_pool: ThreadPoolExecutor | None = None,
+    stop: threading.Event | None = None,
+    sidecar: np.ndarray | None = None,
+    adaptive: AdaptiveBatching | None = None,
+    max_unconfirmed: int = 0,
+) -> int:
+    """Embed and upsert one graph's records. Returns the total uploaded.
+
+    `records` pairs each record with its reader's position just past it
+    (see `iter_jsonl_positions`, or `stream_positions` for records that are
+    not read from a file); `progress` is advanced to each batch's last
+    offset. Up to `upload_workers` upserts are in flight at once while the
+    next batches are read and embedded. Upserts are acknowledged in the order
+    they were sent, and `checkpoint` is called after each one with the
+    position of its last record and the running total, which starts from
+    `uploaded`.
+
+    With `incremental`, the graph's existing point ids and payload hashes are
+    fetched up front. A record whose id is stored with the same payload hash
+    is unchanged and is skipped without being embedded; one whose id is new,
+    or whose IRIs, label or other payload fields changed, is upserted. Once
+    all the records have been read, stored points they no longer produce (nor
+    `seen` does) are deleted, unless the records are not `complete`. Only new
+    and changed points count towards the return value.
+
+    Concurrent uploads (`upload_files` with `jobs`) pass a shared
+    `upsert_pool`, so the total number of writes in flight stays bounded, and
+    a `stop` event, set to abandon the graph at its next batch when another
+    one has failed.
+
+    With a `sidecar`, each record's vector is its row `position.read - 1`
+    and nothing is embedded.
+
+    With `adaptive`, `batch_size` and `upload_batch_size` are only starting
+    points: each is steered by the measured embed and upsert times (see
+    `indexing.adaptive`), and the final log line reports where they ended.
+
+    With `max_unconfirmed` > 0, upserts are sent with `wait=False`: Qdrant
+    acknowledges them once they are in its write-ahead log, before applying
+    them. Every `max_unconfirmed + 1`th upsert waits, and since a shard
+    applies updates in order, that bounds how far application can lag. At
+    the end, if any upsert did not wait, the last batch is upserted again
+    with `wait=True` (a no-op rewrite of the same points) as a barrier, so
+    everything is applied by the time this returns. The barrier is sent
+    after every upsert has been acknowledged: with several upload workers,
+    an upsert that waited may have reached Qdrant before an earlier one that
+    did not, so the last upsert waiting proves nothing.
+    """
+    existing: dict[str, str | None] = {}
+    seen = set() if seen is None else seen
+    skipped = 0
+    if incremental:
+        existing = graph_point_hashes(ctx, graph)
+        logger.info(
+            "incremental graph={} existing points={}", graph, len(existing)
+        )
     logger.info(
-        "starting graph={} file={} records={} batch_size={} "
-        "upload_batch_size={} dry_run={}",
+        "starting graph={} batch_size={} upload_batch_size={} "
+        "upload_workers={} dry_run={}",
         graph,
-        path,
-        total_records,
         batch_size,
         upload_batch_size,
+        upload_workers,
         dry_run,
     )
 
-    progress = tqdm(
-        total=total_records,
-        desc=graph,
-        unit="record",
-        disable=not progress_enabled,
-        dynamic_ncols=True,
-    )
+    def unchanged(pid: str, record: dict[str, Any]) -> bool:
+        if pid not in existing:
+            return False
+        payload = payload_for_record(graph, record)
+        return existing[pid] == payload[CONTENT_HASH_KEY]
+
+    embed_sizer = BatchSizeController(batch_size, adaptive)
+    upsert_sizer = BatchSizeController(upload_batch_size, adaptive)
+
+    unconfirmed = 0
+    sent_unconfirmed = False
+    last_operation: int | None = None
+    last_points: list[PointStruct] = []
+    upsert_lock = threading.Lock()
+
+    def upsert(points: list[PointStruct]) -> int:
+        nonlocal unconfirmed, sent_unconfirmed, last_operation, last_points
+        with upsert_lock:
+            wait = unconfirmed >= max_unconfirmed
+            unconfirmed = 0 if wait else unconfirmed + 1
+            sent_unconfirmed = sent_unconfirmed or not wait
+            last_points = points
+
+        started = time.perf_counter()
+        result = upsert_points(ctx, points, wait=wait)
+        upsert_sizer.observe(len(points), time.perf_counter() - started)
+
+        if result.operation_id is not None:
+            with upsert_lock:
+                last_operation = max(last_operation or 0, result.operation_id)
+        return len(points)
+
     pending_points: list[PointStruct] = []
-    last_logged = 0
-    for record_batch in chunks(iter_jsonl(path, limit=limit), batch_size):
-        pending_points.extend(points_for_batch(ctx, graph, record_batch))
-
-        while len(pending_points) >= upload_batch_size:
-            upload_batch = pending_points[:upload_batch_size]
-            pending_points = pending_points[upload_batch_size:]
-            if not dry_run:
-                ctx.client.upsert(
-                    collection_name=ctx.settings.qdrant_collection,
-                    points=upload_batch,
-                    wait=True,
+    # The reader's position just past each pending point's record.
+    pending_positions: list[JsonlPosition] = []
+    in_flight: deque[tuple[Future[int], JsonlPosition]] = deque()
+    last_logged = uploaded
+
+    def acknowledge_oldest() -> None:
+        nonlocal uploaded, last_logged
+        future, position = in_flight.popleft()
+        count = future.result()
+        uploaded += count
+        if checkpoint is not None:
+            checkpoint(position, uploaded)
+        if uploaded - last_logged >= log_every:
+            logger.info("uploaded graph={} records={}", graph, uploaded)
+            last_logged = uploaded
+
+    def send(size: int) -> None:
+        nonlocal pending_points, pending_positions
+        points = pending_points[:size]
+        position = pending_positions[size - 1]
+        pending_points = pending_points[size:]
+        pending_positions = pending_positions[size:]
+
+        if dry_run:
+            future: Future[int] = Future()
+            future.set_result(len(points))
+        else:
+            future = pool.submit(upsert, points)
+        in_flight.append((future, position))
+        while len(in_flight) > upload_workers:
+            acknowledge_oldest()
+
+    batches = prefetch(
+        chunks(records, lambda: embed_sizer.size), PREFETCH_BATCHES
+    )
+    own_pool = upsert_pool is None
+    with (
+        ThreadPoolExecutor(upload_workers, thread_name_prefix="upsert")
+        if own_pool
+        else nullcontext(upsert_pool)
+    ) as pool:
+        try:
+            for batch in batches:
+                if stop is not None and stop.is_set():
+                    raise UploadCancelled(f"upload of {graph} was stopped")
+                progress.update(batch[-1][0].offset - progress.n)
+                if incremental:
+                    ids = [point_id(graph, record) for _, record in batch]
+                    seen.update(ids)
+                    fresh = [
+                        item
+                        for item, pid in zip(batch, ids, strict=True)
+                        if not unchanged(pid, item[1])
+                    ]
+                    skipped += len(batch) - len(fresh)
+                    if not fresh:
+                        continue
+                    batch = fresh
+
+                record_batch = [record for _, record in batch]
+                batch_vectors = None
+                if sidecar is not None:
+                    rows = [position.read - 1 for position, _ in batch]
+                    batch_vectors = list(sidecar[rows])
+                started = time.perf_counter()
+                pending_points.extend(
+                    points_for_batch(ctx, graph, record_batch, batch_vectors)
+                )
+                embed_sizer.observe(
+                    len(record_batch), time.perf_counter() - started
                 )
-            uploaded += len(upload_batch)
-            progress.update(len(upload_batch))
-            if uploaded - last_logged >= log_every:
-                logger.info("uploaded graph={} records={}", graph, uploaded)
-                last_logged = uploaded
-
-    if pending_points:
-        if not dry_run:
-            ctx.client.upsert(
-                collection_name=ctx.settings.qdrant_collection,
-                points=pending_points,
-                wait=True,
+                pending_positions.extend(position for position, _ in batch)
+
+                # Read the size once: an upsert thread may change it.
+                while len(pending_points) >= (size := upsert_sizer.size):
+                    send(size)
+
+            if pending_points:
+                send(len(pending_points))
+            while in_flight:
+                acknowledge_oldest()
+            if sent_unconfirmed:
+                logger.debug(
+                    "waiting for graph={} updates through operation={}",
+                    graph,
+                    last_operation,
+                )
+                upsert_points(ctx, last_points, wait=True)
+        except BaseException:
+            for future, _ in in_flight:
+                future.cancel()
+            raise
+        finally:
+            batches.close()
+
+    if incremental:
+        stale = sorted(existing.keys() - seen)
+        if not complete:
+            logger.info(
+                "graph={} input is partial, not deleting stale points", graph
             )
-        uploaded += len(pending_points)
-        progress.update(len(pending_points))
+        elif dry_run:
+            logger.info("would delete graph={} stale={}", graph, len(stale))
+        else:
+            delete_points(ctx, stale)
+            logger.info("deleted graph={} stale={}", graph, len(stale))
 
-    progress.close()
-    logger.info("finished graph={} records={}", graph, uploaded)
+    logger.info(
+        "finished graph={} records={} unchanged={} batch_size={} "
+        "upload_batch_size={}",
+        graph,
+        uploaded,
+        skipped,
+        embed_sizer.size,
+        upsert_sizer.size,
+    )
 
     return uploaded
 
 
+def upload_concurrently(
+    ctx: AppContext,
+    paths: list[Path],
+    *,
+    jobs: int,
+    upload_workers: int,
+    **options: Any,
+) -> int:
+    """Upload up to `jobs` files at once. Returns the total.
+
+    The files share the embedder (ONNX Runtime releases the GIL, so their
+    embedding runs in parallel) and one pool of `upload_workers` upsert
+    threads, so Qdrant sees at most that many writes at a time however many
+    files are in progress. Progress bars stack, one per file in progress. If
+    a file fails, the others stop at their next batch and the first error is
+    raised.
+    """
+    stop = threading.Event()
+    with (
+        ThreadPoolExecutor(upload_workers, thread_name_prefix="upsert") as pool,
+        ThreadPoolExecutor(jobs, thread_name_prefix="upload") as files,
+    ):
+        futures = [
+            files.submit(
+                upload_file,
+                ctx,
+                path,
+                upload_workers=upload_workers,
+                upsert_pool=pool,
+                stop=stop,
+                **options,
+            )
+            for path in paths
+        ]
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        failed = [f for f in done if f.exception() is not None]
+        if failed:
+            stop.set()
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            raise failed[0].exception()
+
+    return sum(future.result() for future in futures)
+
+
+def run_upload(
+    ctx: AppContext,
+    upload: Callable[[AppContext], int],
+    *,
+    create_collection: bool,
+    payload_indexes: bool,
+    dry_run: bool,
+    vector_cache: Path | None = None,
+    bulk_load: bool = False,
+) -> int:
+    """Prepare the collection, run `upload` and finish up. Returns its total.
+
+    `upload` is called with the context to upload through. With
+    `vector_cache`, vectors are read from and added to the on-disk
+    `VectorCache` there, so texts embedded by any earlier run are not
+    embedded again. With `bulk_load`, indexing is deferred for the whole
+    upload (see `begin_bulk_load`); the index settings are restored even if
+    it fails, but only a successful upload waits for the index to be built.
+    """
+    cache_embedder = None
+    if vector_cache is not None:
+        cache = VectorCache(vector_cache, ctx.settings.model_name)
+        logger.info(
+            "vector cache {} holds {} vectors", cache.directory, len(cache)
+        )
+        cache_embedder = VectorCachingEmbedder(ctx.embedder, cache)
+        ctx = replace(ctx, embedder=cache_embedder)
+
+    if not dry_run:
+        ensure_collection(ctx, create_if_missing=create_collection)
+        if payload_indexes:
+            ensure_payload_indexes(ctx)
+
+    restore = None
+    if bulk_load and not dry_run:
+        restore = begin_bulk_load(ctx)
+    try:
+        total = upload(ctx)
+    except BaseException:
+        if restore is not None:
+            end_bulk_load(ctx, restore, wait=False)
+        raise
+    if restore is not None:
+        end_bulk_load(ctx, restore)
+
+    if cache_embedder is not None:
+        logger.info(
+            "vector cache hits={} misses={}",
+            cache_embedder.hits,
+            cache_embedder.misses,
+        )
+    if not dry_run and total:
+        mark_upload_generation(ctx)
+
+    return total
+
+
 def upload_files(
     ctx: AppContext,
     paths: list[Path],
@@ -259,26 +1069,119 @@ def upload_files(
     dry_run: bool,
     progress_enabled: bool,
     log_every: int,
+    upload_workers: int = 1,
+    resume: bool = False,
+    checkpoint_dir: Path | None = None,
+    incremental: bool = False,
+    vector_cache: Path | None = None,
+    jobs: int = 1,
+    vectors: bool = False,
+    vectors_dir: Path | None = None,
+    adaptive: AdaptiveBatching | None = None,
+    max_unconfirmed: int = 0,
+    bulk_load: bool = False,
 ) -> int:
-    """Prepare the collection and upload every input file. Returns the total."""
-    if not dry_run:
-        ensure_collection(ctx, create_if_missing=create_collection)
-        if payload_indexes:
-            ensure_payload_indexes(ctx)
+    """Prepare the collection and upload every input file. Returns the total.
 
-    total = 0
+    With `jobs` > 1, that many files upload at once (see
+    `upload_concurrently`). `vector_cache` and `bulk_load` are as for
+    `run_upload`.
+    """
     for path in paths:
         if not path.exists():
             raise FileNotFoundError(path)
-        total += upload_file(
-            ctx,
-            path,
-            batch_size=batch_size,
-            upload_batch_size=upload_batch_size,
-            limit=limit,
-            dry_run=dry_run,
-            progress_enabled=progress_enabled,
-            log_every=log_every,
-        )
 
-    return total
+    options = dict(
+        batch_size=batch_size,
+        upload_batch_size=upload_batch_size,
+        limit=limit,
+        dry_run=dry_run,
+        progress_enabled=progress_enabled,
+        log_every=log_every,
+        upload_workers=upload_workers,
+        resume=resume,
+        checkpoint_dir=checkpoint_dir,
+        incremental=incremental,
+        vectors=vectors,
+        vectors_dir=vectors_dir,
+        adaptive=adaptive,
+        max_unconfirmed=max_unconfirmed,
+    )
+
+    def upload(ctx: AppContext) -> int:
+        if jobs == 1:
+            return sum(upload_file(ctx, path, **options) for path in paths)
+        return upload_concurrently(ctx, paths, jobs=jobs, **options)
+
+    return run_upload(
+        ctx,
+        upload,
+        create_collection=create_collection,
+        payload_indexes=payload_indexes,
+        dry_run=dry_run,
+        vector_cache=vector_cache,
+        bulk_load=bulk_load,
+    )
+
+
+def upload_stream(
+    ctx: AppContext,
+    graph: str,
+    records: Iterable[dict[str, Any]],
+    *,
+    batch_size: int,
+    upload_batch_size: int,
+    create_collection: bool,
+    payload_indexes: bool,
+    dry_run: bool,
+    progress_enabled: bool,
+    log_every: int,
+    upload_workers: int = 1,
+    incremental: bool = False,
+    complete: bool = True,
+    vector_cache: Path | None = None,
+    adaptive: AdaptiveBatching | None = None,
+    max_unconfirmed: int = 0,
+    bulk_load: bool = False,
+) -> int:
+    """Prepare the collection and upload records as `graph`.
+
+    `upload_files` for records produced in memory, e.g. by textify, so that
+    they never go through a JSONL file. There is no file to checkpoint or to
+    find a vector sidecar for, so a failed stream is started over. Pass
+    `complete=False` if `records` may not be all of the graph, so that
+    `incremental` does not delete the rest as stale.
+    """
+
+    def upload(ctx: AppContext) -> int:
+        with tqdm(
+            desc=graph,
+            unit=" records",
+            disable=not progress_enabled,
+            dynamic_ncols=True,
+        ) as progress:
+            return upload_records(
+                ctx,
+                graph,
+                stream_positions(records),
+                batch_size=batch_size,
+                upload_batch_size=upload_batch_size,
+                dry_run=dry_run,
+                progress=progress,
+                log_every=log_every,
+                upload_workers=upload_workers,
+                incremental=incremental,
+                complete=complete,
+                adaptive=adaptive,
+                max_unconfirmed=max_unconfirmed,
+            )
+
+    return run_upload(
+        ctx,
+        upload,
+        create_collection=create_collection,
+        payload_indexes=payload_indexes,
+        dry_run=dry_run,
+        vector_cache=vector_cache,
+        bulk_load=bulk_load,
+    )
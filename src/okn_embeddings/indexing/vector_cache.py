@@ -0,0 +1,223 @@
+"""Persistent, content-addressed store of embedded vectors.
+
+The uploader embeds every record's `embedding_text`, yet most texts were
+already embedded by an earlier run: the previous release of the same graph,
+another graph with the same text, or the same file before a collection
+rebuild with different HNSW or quantization settings. This store keeps every
+vector it has seen, keyed by the sha256 digest of its text, so those runs need
+no model inference.
+
+On disk, one directory per model holds:
+
+- `vectors.f32`: a float32 matrix, one row per text, memory-mapped for reads;
+- `digests.bin`: the 32-byte text digest of each row, in row order;
+- `meta.json`: the model name and vector dimension.
+
+Both data files are append-only. Rows are appended before their digests, so
+the index never points past the matrix; a run killed mid-append leaves at
+most a torn tail, which is cut off before the next append.
+"""
+
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from ..core.embedding import Embedder
+from .text import text_digest
+
+DIGEST_SIZE = 32
+
+
+class VectorCache:
+    """Append-only digest -> vector store for one embedding model.
+
+    Several processes may share one directory, e.g. concurrent uploads with
+    one `--vector-cache`. Appends and tail repair hold an exclusive `flock`
+    on its `lock` file, and a row's number is its position on disk, so each
+    process picks up the others' rows (`_refresh`) instead of numbering its
+    own from what it has seen.
+    """
+
+    def __init__(self, directory: Path, model_name: str):
+        self.directory = directory / model_name.replace("/", "__")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self._vectors_path = self.directory / "vectors.f32"
+        self._digests_path = self.directory / "digests.bin"
+        self._meta_path = self.directory / "meta.json"
+        self._lock_path = self.directory / "lock"
+        self._lock = threading.Lock()
+        self._rows: dict[bytes, int] = {}
+        # Rows on disk that `_rows` covers; more than len(_rows) only if
+        # the same digest was somehow stored twice.
+        self._count = 0
+        self._matrix: np.ndarray | None = None
+        self.dim: int | None = None
+
+        with self._locked():
+            self._read_meta()
+            if self.dim is not None:
+                self._repair()
+            self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold this instance's lock and the directory's `flock`."""
+        with self._lock, self._lock_path.open("a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _row_bytes(self) -> int:
+        assert self.dim is not None
+        return self.dim * np.dtype(np.float32).itemsize
+
+    def _read_meta(self) -> None:
+        if self.dim is not None or not self._meta_path.exists():
+            return
+        meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+        if meta["model"] != self.model_name:
+            raise ValueError(
+                f"{self.directory} holds vectors for {meta['model']}, "
+                f"not {self.model_name}"
+            )
+        self.dim = int(meta["dim"])
+
+    def _repair(self) -> None:
+        """Drop a torn tail from an interrupted append. Needs the flock."""
+        count = min(
+            self._size(self._vectors_path) // self._row_bytes(),
+            self._size(self._digests_path) // DIGEST_SIZE,
+        )
+        for path, size in (
+            (self._vectors_path, count * self._row_bytes()),
+            (self._digests_path, count * DIGEST_SIZE),
+        ):
+            if self._size(path) != size:
+                os.truncate(path, size)
+
+    def _refresh(self) -> None:
+        """Index the rows appended since this instance last looked.
+
+        Safe without the flock: rows are written before their digests, so
+        every whole digest on disk already has its row.
+        """
+        self._read_meta()
+        if self.dim is None:
+            return
+        count = self._size(self._digests_path) // DIGEST_SIZE
+        if count <= self._count:
+            return
+        with self._digests_path.open("rb") as f:
+            f.seek(self._count * DIGEST_SIZE)
+            digests = f.read((count - self._count) * DIGEST_SIZE)
+        for i in range(len(digests) // DIGEST_SIZE):
+            digest = digests[i * DIGEST_SIZE : (i + 1) * DIGEST_SIZE]
+            self._rows.setdefault(digest, self._count + i)
+        self._count += len(digests) // DIGEST_SIZE
+        self._remap()
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        return path.stat().st_size if path.exists() else 0
+
+    def _remap(self) -> None:
+        assert self.dim is not None
+        self._matrix = (
+            np.memmap(
+                self._vectors_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(self._count, self.dim),
+            )
+            if self._count
+            else None
+        )
+
+    def get_many(self, keys: list[bytes]) -> list[np.ndarray | None]:
+        """The stored vector for each key, or None where there is none."""
+        with self._lock:
+            self._refresh()
+            matrix = self._matrix
+            rows = [self._rows.get(key) for key in keys]
+        return [None if row is None else matrix[row] for row in rows]
+
+    def put_many(self, keys: list[bytes], vectors: list[np.ndarray]) -> None:
+        """Store new vectors; keys that are already present are ignored."""
+        with self._locked():
+            # Another process may have appended, or left a torn tail.
+            self._read_meta()
+            if self.dim is not None:
+                self._repair()
+            self._refresh()
+
+            new: dict[bytes, np.ndarray] = {}
+            for key, vector in zip(keys, vectors, strict=True):
+                if key not in self._rows:
+                    new[key] = vector
+            if not new:
+                return
+
+            matrix = np.stack(list(new.values()), dtype=np.float32)
+            if self.dim is None:
+                self.dim = int(matrix.shape[1])
+                self._meta_path.write_text(
+                    json.dumps({"model": self.model_name, "dim": self.dim}),
+                    encoding="utf-8",
+                )
+
+            with self._vectors_path.open("ab") as f:
+                f.write(matrix.tobytes())
+            with self._digests_path.open("ab") as f:
+                f.write(b"".join(new))
+            self._refresh()
+
+
+class VectorCachingEmbedder:
+    """Serve embeddings from a `VectorCache`, embedding only unseen texts.
+
+    Unlike `CachedEmbedder` this caches `embed_many`, since the bulk
+    uploader is exactly the caller that benefits, and it persists across
+    runs. Returned arrays may be read-only views of the memory map.
+    """
+
+    def __init__(self, inner: Embedder, cache: VectorCache):
+        self.inner = inner
+        self.cache = cache
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: list[str]) -> list[np.ndarray]:
+        keys = [text_digest(text) for text in texts]
+        vectors = self.cache.get_many(keys)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        if missing:
+            # As stored, so a miss upserts exactly what a later hit will.
+            embedded = [
+                np.asarray(vector, dtype=np.float32)
+                for vector in self.inner.embed_many([texts[i] for i in missing])
+            ]
+            self.cache.put_many([keys[i] for i in missing], embedded)
+            for i, vector in zip(missing, embedded, strict=True):
+                vectors[i] = vector
+
+        return [vector for vector in vectors if vector is not None]
@@ -0,0 +1,78 @@
+"""Vector sidecars: a file's embeddings, computed ahead of the upload.
+
+`okn-indexing embed` writes one float32 row per record of a JSONL file, in
+record order, to an `.npy` file beside it (`graph.jsonl` ->
+`graph.jsonl.vectors.npy`), plus a small JSON manifest. `upload --vectors`
+then memory-maps the matrix and reads each record's row instead of embedding,
+so the CPU/GPU-heavy stage and the network-heavy stage can run separately, on
+different machines or at different times.
+
+Rows are matched to records by position, so a sidecar is only valid for the
+exact file it was written from. The manifest records that file's size and
+mtime and the model, and `open_vectors` refuses a sidecar that no longer
+matches.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+VECTORS_SUFFIX = ".vectors.npy"
+MANIFEST_SUFFIX = ".vectors.json"
+
+
+def vectors_path(path: Path, directory: Path | None = None) -> Path:
+    """Where the sidecar for `path` lives: beside it, or in `directory`."""
+    return (directory or path.parent) / f"{path.name}{VECTORS_SUFFIX}"
+
+
+def manifest_path(sidecar: Path) -> Path:
+    return sidecar.with_name(
+        sidecar.name.removesuffix(VECTORS_SUFFIX) + MANIFEST_SUFFIX
+    )
+
+
+def source_manifest(path: Path, model_name: str, rows: int) -> dict:
+    stat = path.stat()
+    return {
+        "model": model_name,
+        "rows": rows,
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def write_manifest(
+    path: Path, sidecar: Path, model_name: str, rows: int
+) -> None:
+    manifest = source_manifest(path, model_name, rows)
+    manifest_path(sidecar).write_text(json.dumps(manifest), encoding="utf-8")
+
+
+def open_vectors(path: Path, sidecar: Path, model_name: str) -> np.ndarray:
+    """Memory-map the sidecar of `path`, checking it still belongs to it."""
+    try:
+        manifest = json.loads(
+            manifest_path(sidecar).read_text(encoding="utf-8")
+        )
+    except FileNotFoundError:
+        raise ValueError(
+            f"No vectors for {path} at {sidecar}; run `okn-indexing embed`"
+        ) from None
+
+    if manifest["model"] != model_name:
+        raise ValueError(
+            f"{sidecar} was embedded with {manifest['model']}, not {model_name}"
+        )
+    expected = source_manifest(path, model_name, manifest["rows"])
+    if manifest != expected:
+        raise ValueError(
+            f"{path} changed since {sidecar} was written; re-run "
+            "`okn-indexing embed`"
+        )
+
+    vectors = np.load(sidecar, mmap_mode="r")
+    if vectors.shape[0] != manifest["rows"]:
+        raise ValueError(f"{sidecar} is truncated")
+    return vectors
@@ -0,0 +1,154 @@
+"""ASGI entry point serving the same routes over the async query engine.
+
+A sync gunicorn worker is tied up for the whole Qdrant round trip, so its
+concurrency is its worker count. Here every request is a task on one event
+loop, awaiting `core.aio`, so a process keeps many searches in flight. The
+pages and JSON match the Flask app in `app.py`/`routes.py`, which stays the
+default.
+
+Run with any ASGI server, e.g. ``hypercorn okn_embeddings.web.asgi:app``.
+"""
+
+from typing import cast
+
+from loguru import logger
+from pydantic import ValidationError
+from quart import Blueprint, Quart, current_app, jsonify, render_template
+from quart import request as quart_request
+
+from ..config import AsyncAppContext
+from ..core import aio
+from ..core.models import BatchQuery, Query, build_query
+from .routes import (
+    cache_stats,
+    parse_error,
+    serialize_batch_result,
+    serialize_point,
+)
+
+
+class WrappedQuart(Quart):
+    ctx: AsyncAppContext
+
+
+def get_ctx() -> AsyncAppContext:
+    app = cast(WrappedQuart, current_app)
+    return app.ctx
+
+
+api = Blueprint("api", __name__)
+web = Blueprint("web", __name__)
+
+
+@api.post("/query")
+async def post_query():
+    data = await quart_request.get_json(silent=True) or {}
+
+    try:
+        q = Query.model_validate(data)
+    except ValidationError as e:
+        return jsonify({"error": "invalid request", "details": e.errors()}), 400
+
+    try:
+        result = await aio.run_similarity_search(get_ctx(), query_obj=q)
+    except Exception as e:
+        msg, status = parse_error(e)
+        return jsonify({"error": msg}), status
+
+    return jsonify({"results": [serialize_point(p) for p in result.points]})
+
+
+@api.post("/query/batch")
+async def post_query_batch():
+    data = await quart_request.get_json(silent=True) or {}
+
+    try:
+        batch = BatchQuery.model_validate(data)
+    except ValidationError as e:
+        return jsonify({"error": "invalid request", "details": e.errors()}), 400
+
+    try:
+        results = await aio.run_batch_search(get_ctx(), batch.queries)
+    except Exception as e:
+        msg, status = parse_error(e)
+        return jsonify({"error": msg}), status
+
+    return jsonify({"results": [serialize_batch_result(r) for r in results]})
+
+
+@api.get("/cache-stats")
+async def get_cache_stats():
+    ctx = get_ctx()
+    return jsonify(cache_stats(ctx.embedder, ctx.result_cache))
+
+
+@web.get("/")
+async def index():
+    args = quart_request.args
+
+    return await render_template(
+        "index.html",
+        feature_type=args.get("type", "Text"),
+        feature_value=args.get("value", ""),
+        graphs=await aio.get_graphs(get_ctx()),
+        graph_mode=args.get("graph-mode", "include"),
+        selected_graphs=args.getlist("graph"),
+    )
+
+
+@web.post("/query-view")
+async def post_query_view():
+    form = await quart_request.form
+
+    try:
+        q = build_query(
+            feature_type=form.get("feat_type", ""),
+            value=form.get("feat_value", ""),
+            include_graphs=form.getlist("include_graphs"),
+            exclude_graphs=form.getlist("exclude_graphs"),
+            limit=form.get("limit", 10),
+            offset=form.get("offset", 0),
+            point_id=form.get("feat_point_id"),
+        )
+    except ValidationError:
+        return await render_template(
+            "partials/results_table.html",
+            results=[],
+            error="Invalid query.",
+        ), 400
+
+    try:
+        result = await aio.run_similarity_search(get_ctx(), query_obj=q)
+    except Exception as e:
+        msg, status = parse_error(e)
+        return await render_template(
+            "partials/results_table.html",
+            results=[],
+            error=msg,
+        ), status
+
+    return await render_template(
+        "partials/results_table.html",
+        results=[serialize_point(p) for p in result.points],
+        query=q,
+    )
+
+
+def create_app() -> WrappedQuart:
+    app = WrappedQuart(__name__)
+
+    ctx = AsyncAppContext.from_env()
+    logger.info("Detected settings: " + str(ctx.settings))
+    app.ctx = ctx
+
+    @app.after_serving
+    async def close_client():
+        await ctx.client.close()
+
+    app.register_blueprint(api)
+    app.register_blueprint(web)
+
+    return app
+
+
+app = create_app()
@@ -1,3 +1,4 @@
+from dataclasses import asdict
 from urllib.parse import quote
 
 import httpx
@@ -5,9 +6,13 @@ from flask import Blueprint, jsonify, render_template, request
 from pydantic import ValidationError
 from qdrant_client.models import ScoredPoint
 
+from ..core.batch import BatchResult, run_batch_search
+from ..core.embedding import CachedEmbedder, Embedder
 from ..core.errors import URINotFoundError, unwrap_qdrant_error
-from ..core.models import Query, build_query
-from ..core.query import run_similarity_search
+from ..core.graphs import get_graph_facets
+from ..core.models import BatchQuery, Query, build_query
+from ..core.query import lookup_node, run_similarity_search
+from ..core.result_cache import ResultCache, collection_version
 from ..core.results import summarize_point
 from ._flask import get_ctx
 
@@ -68,6 +73,64 @@ def post_query():
     return jsonify({"results": [serialize_point(p) for p in result.points]})
 
 
+def serialize_batch_result(result: BatchResult) -> dict:
+    if isinstance(result, Exception):
+        msg, status = parse_error(result)
+        return {"error": msg, "status": status}
+    return {"results": [serialize_point(p) for p in result.points]}
+
+
+def cache_stats(embedder: Embedder, result_cache: ResultCache | None) -> dict:
+    """Hit/miss counters for this worker's caches, for tuning their sizes."""
+    stats = {}
+
+    if result_cache is not None:
+        stats["results"] = asdict(result_cache.stats)
+
+    if isinstance(embedder, CachedEmbedder):
+        embed_stats = embedder.stats
+        stats["query_embedding"] = asdict(embed_stats) | {
+            "hit_rate": embed_stats.hit_rate
+        }
+
+    stats["node_lookup"] = lookup_node.cache_info()._asdict()
+    stats["graph_facets"] = get_graph_facets.cache_info()._asdict()
+    stats["collection_version"] = collection_version.cache_info()._asdict()
+
+    return stats
+
+
+@api.get("/cache-stats")
+def get_cache_stats():
+    ctx = get_ctx()
+    return jsonify(cache_stats(ctx.embedder, ctx.result_cache))
+
+
+@api.post("/query/batch")
+def post_query_batch():
+    """Run many queries in one call; one entry per query, in order.
+
+    A node query whose IRI is unknown gets an `error` entry of its own
+    instead of failing the other queries.
+    """
+    data = request.get_json(silent=True) or {}
+
+    try:
+        batch = BatchQuery.model_validate(data)
+    except ValidationError as e:
+        return jsonify({"error": "invalid request", "details": e.errors()}), 400
+
+    ctx = get_ctx()
+
+    try:
+        results = run_batch_search(ctx, batch.queries)
+    except Exception as e:
+        msg, status = parse_error(e)
+        return jsonify({"error": msg}), status
+
+    return jsonify({"results": [serialize_batch_result(r) for r in results]})
+
+
 @web.get("/")
 def index():
     ctx = get_ctx()
@@ -101,6 +164,7 @@ def post_query_view():
             exclude_graphs=form.getlist("exclude_graphs"),
             limit=form.get("limit", 10),
             offset=form.get("offset", 0),
+            point_id=form.get("feat_point_id"),
         )
     except ValidationError:
         return render_template(
@@ -94,6 +94,17 @@ document.addEventListener("change", (e) => {
   }
 });
 
+// A point id set by "find similar" only describes that exact node query.
+document.addEventListener("input", (e) => {
+  const target = e.target;
+  if (!(target instanceof HTMLElement)) return;
+
+  if (target.matches("[name='feat_type'], [name='feat_value']")) {
+    const pointIdEl = document.querySelector("[name='feat_point_id']");
+    if (pointIdEl instanceof HTMLInputElement) pointIdEl.value = "";
+  }
+});
+
 document.addEventListener("click", (e) => {
   const target = e.target;
   if (!(target instanceof HTMLElement)) return;
@@ -235,6 +246,7 @@ document.addEventListener("click", (e) => {
     const uri = triggerBtn.getAttribute("data-uri") || "";
     const graph = triggerBtn.getAttribute("data-graph") || "";
     const external = triggerBtn.getAttribute("data-external") || "";
+    const pointId = triggerBtn.getAttribute("data-point-id") || "";
 
     // Extract repr from adjacent template.
     let repr = "";
@@ -244,7 +256,7 @@ document.addEventListener("click", (e) => {
       repr = parseTemplateJson(tmpl);
     }
 
-    activeRowContext = { uri, graph, external, repr };
+    activeRowContext = { uri, graph, external, repr, pointId };
 
     const externalLink = document.getElementById("actions-external");
     if (externalLink instanceof HTMLAnchorElement) {
@@ -271,6 +283,11 @@ document.addEventListener("click", (e) => {
       if (featureTypeEl instanceof HTMLSelectElement) featureTypeEl.value = "node";
       if (featureValueEl instanceof HTMLInputElement) featureValueEl.value = ctx.uri;
 
+      // Lets the server query by the result's point directly instead of
+      // looking the IRI up again. Cleared as soon as the user edits the query.
+      const pointIdEl = document.querySelector("[name='feat_point_id']");
+      if (pointIdEl instanceof HTMLInputElement) pointIdEl.value = ctx.pointId;
+
       submitQueryForm();
       return;
     }
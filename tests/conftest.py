@@ -1,10 +1,15 @@
+import asyncio
+
 import pytest
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.models import Distance, VectorParams
 
-from okn_embeddings.config.context import AppContext
+from okn_embeddings.config.context import AppContext, AsyncAppContext
 from okn_embeddings.config.settings import AppSettings
 from okn_embeddings.core.embedding import FastEmbedEmbedder
+from okn_embeddings.core.graphs import get_graph_facets
+from okn_embeddings.core.query import lookup_node
+from okn_embeddings.core.result_cache import collection_version
 
 _COLLECTION = "test-graph"
 _MODEL = "sentence-transformers/all-MiniLM-L6-v2"
@@ -16,20 +21,46 @@ def embedder() -> FastEmbedEmbedder:
     return FastEmbedEmbedder(_MODEL)
 
 
-@pytest.fixture
-def ctx(embedder: FastEmbedEmbedder) -> AppContext:
-    # A real AppContext over an in-memory Qdrant: no server, a fresh DB per
-    # test, but the actual client / embedder / query path -- no fakes.
-    settings = AppSettings(
+def _settings() -> AppSettings:
+    return AppSettings(
         qdrant_location=":memory:",
         qdrant_collection=_COLLECTION,
         qdrant_hnsw_ef=128,
         qdrant_timeout=30,
         model_name=_MODEL,
     )
+
+
+@pytest.fixture
+def ctx(embedder: FastEmbedEmbedder) -> AppContext:
+    # A real AppContext over an in-memory Qdrant: no server, a fresh DB per
+    # test, but the actual client / embedder / query path -- no fakes.
+    settings = _settings()
+    # Lookups are cached by location, which every in-memory DB shares.
+    lookup_node.cache_clear()
+    get_graph_facets.cache_clear()
+    collection_version.cache_clear()
     client = QdrantClient(":memory:")
     dim = len(embedder.embed("dimension probe"))
     client.create_collection(
         _COLLECTION, VectorParams(size=dim, distance=Distance.COSINE)
     )
     return AppContext(client=client, embedder=embedder, settings=settings)
+
+
+@pytest.fixture
+def async_ctx(embedder: FastEmbedEmbedder) -> AsyncAppContext:
+    # The asyncio counterpart of `ctx`, over its own in-memory Qdrant.
+    lookup_node.cache_clear()
+    get_graph_facets.cache_clear()
+    collection_version.cache_clear()
+    client = AsyncQdrantClient(":memory:")
+    dim = len(embedder.embed("dimension probe"))
+    asyncio.run(
+        client.create_collection(
+            _COLLECTION, VectorParams(size=dim, distance=Distance.COSINE)
+        )
+    )
+    return AsyncAppContext(
+        client=client, embedder=embedder, settings=_settings()
+    )
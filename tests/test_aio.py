@@ -0,0 +1,112 @@
+import asyncio
+import math
+
+import numpy as np
+import pytest
+from qdrant_client.models import PointStruct
+
+from okn_embeddings.config.context import AsyncAppContext
+from okn_embeddings.core import aio
+from okn_embeddings.core.errors import URINotFoundError
+from okn_embeddings.core.graphs import get_graph_facets
+from okn_embeddings.core.models import (
+    NodeFeature,
+    Query,
+    TextFeature,
+    build_feature,
+)
+from okn_embeddings.core.query import lookup_node
+
+
+def _unit(dim: int, cosine: float) -> list[float]:
+    # A unit vector whose cosine similarity to [1, 0, 0, ...] is `cosine`.
+    v = [0.0] * dim
+    v[0] = cosine
+    v[1] = math.sqrt(max(0.0, 1.0 - cosine * cosine))
+    return v
+
+
+def _seed(ctx: AsyncAppContext, rows: list[tuple[str, float]]) -> int:
+    # One point per (graph, cosine-to-the-query) row, IRI urn:<i>.
+    dim = len(ctx.embedder.embed("probe"))
+    asyncio.run(
+        ctx.client.upsert(
+            ctx.settings.qdrant_collection,
+            points=[
+                PointStruct(
+                    id=i,
+                    vector=_unit(dim, cosine),
+                    payload={"graph": graph, "iri": [f"urn:{i}"]},
+                )
+                for i, (graph, cosine) in enumerate(rows)
+            ],
+        )
+    )
+    return dim
+
+
+def test_get_embedding_text_routes_through_embedder(
+    async_ctx: AsyncAppContext,
+):
+    out = asyncio.run(
+        aio.get_embedding(async_ctx, TextFeature(type="text", value="diabetes"))
+    )
+
+    assert np.array_equal(out, async_ctx.embedder.embed("diabetes"))
+
+
+def test_unknown_node_raises(async_ctx: AsyncAppContext):
+    with pytest.raises(URINotFoundError):
+        asyncio.run(
+            aio.get_embedding(
+                async_ctx, NodeFeature(type="node", value="urn:missing")
+            )
+        )
+
+
+def test_similarity_search_by_node(async_ctx: AsyncAppContext):
+    _seed(async_ctx, [("g", 1.0), ("g", 0.2), ("g", 0.9)])
+
+    resp = asyncio.run(
+        aio.run_similarity_search(
+            async_ctx, Query(feature=build_feature("node", "urn:0"), limit=3)
+        )
+    )
+
+    assert [p.id for p in resp.points] == [0, 2, 1]
+
+
+def test_run_survey_orders_graphs_by_best_score(
+    async_ctx: AsyncAppContext, monkeypatch
+):
+    dim = _seed(
+        async_ctx,
+        [("g_high", 1.0), ("g_mid", 0.5), ("g_low", 0.2)],
+    )
+
+    async def embed(_ctx, _feature):
+        return np.array(_unit(dim, 1.0), dtype=np.float32)
+
+    monkeypatch.setattr("okn_embeddings.core.aio.get_embedding", embed)
+
+    # No include/exclude: the graph list comes from the facet call.
+    results = asyncio.run(
+        aio.run_survey(async_ctx, build_feature("text", "q"), limit=2)
+    )
+
+    assert [r.graph for r in results] == ["g_high", "g_mid", "g_low"]
+    assert results[0].points[0].score == pytest.approx(1.0, abs=1e-3)
+
+
+def test_cached_lookups_count_hits_and_misses(async_ctx: AsyncAppContext):
+    _seed(async_ctx, [("g", 1.0)])
+    feature = build_feature("node", "urn:0")
+
+    for _ in range(2):
+        asyncio.run(aio.get_embedding(async_ctx, feature))
+        asyncio.run(aio.get_graphs(async_ctx))
+
+    # The same counters the synchronous path reports at /cache-stats.
+    for cached in (lookup_node, get_graph_facets):
+        info = cached.cache_info()
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
@@ -0,0 +1,81 @@
+from qdrant_client.models import PointStruct
+
+from okn_embeddings.config.context import AppContext
+from okn_embeddings.core.batch import lookup_nodes, run_batch_search
+from okn_embeddings.core.errors import URINotFoundError
+from okn_embeddings.core.models import build_query
+from okn_embeddings.core.query import lookup_node, run_similarity_search
+
+
+def _seed(ctx: AppContext) -> None:
+    # Three texts in two graphs. The second point groups two IRIs, and urn:a
+    # also appears in graph h, so lookups must pick the first point by id.
+    rows = [
+        (1, "g", ["urn:a"], "diabetes"),
+        (2, "g", ["urn:b", "urn:c"], "insulin"),
+        (3, "h", ["urn:a"], "weather"),
+    ]
+    ctx.client.upsert(
+        ctx.settings.qdrant_collection,
+        points=[
+            PointStruct(
+                id=pid,
+                vector=ctx.embedder.embed(text).tolist(),
+                payload={"graph": graph, "iri": iris},
+            )
+            for pid, graph, iris, text in rows
+        ],
+    )
+
+
+def test_lookup_nodes_resolves_grouped_and_repeated_iris(ctx: AppContext):
+    _seed(ctx)
+
+    nodes = lookup_nodes(ctx, ["urn:a", "urn:c", "urn:missing"])
+
+    assert {iri: node.id for iri, node in nodes.items()} == {
+        "urn:a": 1,
+        "urn:c": 2,
+    }
+
+
+def test_lookup_nodes_counts_cache_hits_and_misses(ctx: AppContext):
+    _seed(ctx)
+
+    lookup_nodes(ctx, ["urn:a", "urn:missing"])
+    lookup_nodes(ctx, ["urn:a", "urn:missing"])
+
+    # The stats /cache-stats reports; unknown IRIs are not cached.
+    info = lookup_node.cache_info()
+    assert (info.hits, info.misses) == (1, 3)
+
+
+def test_batch_matches_individual_searches(ctx: AppContext):
+    _seed(ctx)
+    queries = [
+        build_query("text", "diabetes", limit=2),
+        build_query("node", "urn:b", include_graphs=["g"]),
+        build_query("text", "weather", exclude_graphs=["h"], offset=1),
+    ]
+
+    results = run_batch_search(ctx, queries)
+
+    assert len(results) == len(queries)
+    for query, result in zip(queries, results, strict=True):
+        single = run_similarity_search(ctx, query)
+        assert [p.id for p in result.points] == [p.id for p in single.points]
+
+
+def test_batch_reports_unknown_iri_in_its_slot(ctx: AppContext):
+    _seed(ctx)
+
+    results = run_batch_search(
+        ctx,
+        [
+            build_query("node", "urn:missing"),
+            build_query("text", "insulin", limit=1),
+        ],
+    )
+
+    assert isinstance(results[0], URINotFoundError)
+    assert [p.id for p in results[1].points] == [2]
@@ -1,6 +1,12 @@
+import json
+
 import pytest
 from pydantic import ValidationError
+from qdrant_client.models import PointStruct
+from typer.testing import CliRunner
 
+from okn_embeddings.cli.main import app
+from okn_embeddings.config.context import AppContext
 from okn_embeddings.core.models import (
     NodeFeature,
     TextFeature,
@@ -69,3 +75,31 @@ def test_build_query_rejects_both_include_and_exclude():
 def test_build_query_rejects_unknown_feature_type():
     with pytest.raises(ValidationError):
         build_query(feature_type="bogus", value="x")
+
+
+def test_similar_batch_streams_one_line_per_iri(ctx: AppContext, monkeypatch):
+    ctx.client.upsert(
+        ctx.settings.qdrant_collection,
+        points=[
+            PointStruct(
+                id=i,
+                vector=ctx.embedder.embed(text).tolist(),
+                payload={"graph": "g", "iri": [f"urn:{i}"], "label": text},
+            )
+            for i, text in enumerate(["diabetes", "insulin", "weather"])
+        ],
+    )
+    monkeypatch.setattr(AppContext, "from_env", staticmethod(lambda: ctx))
+
+    result = CliRunner().invoke(
+        app,
+        ["similar-batch", "--limit", "1", "--chunk-size", "2"],
+        input="urn:0\n\nurn:missing\nurn:2\n",
+    )
+
+    assert result.exit_code == 0, result.output
+    lines = [json.loads(line) for line in result.output.splitlines()]
+    assert [line["iri"] for line in lines] == ["urn:0", "urn:missing", "urn:2"]
+    assert lines[0]["results"][0]["primary_uri"] == "urn:0"
+    assert "error" in lines[1]
+    assert lines[2]["results"][0]["label"] == "weather"
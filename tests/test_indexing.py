@@ -1,13 +1,31 @@
+import io
+import json
+import multiprocessing
+from dataclasses import asdict
+
+import pytest
 from qdrant_client.models import ScoredPoint
 from rdflib import Graph, Literal, URIRef
 from rdflib.namespace import RDF
+from typer.testing import CliRunner
 
+from okn_embeddings.config.context import AppContext
 from okn_embeddings.core.results import summarize_point
+from okn_embeddings.indexing import cli
 from okn_embeddings.indexing.models import (
     MaterializationConfiguration,
     TargetConfiguration,
 )
 from okn_embeddings.indexing.output import WorkerRecord, write_jsonl
+from okn_embeddings.indexing.parallel import (
+    MaterializedShards,
+    encode_shard_record,
+    iter_shard_file,
+    iter_shard_records,
+    shard_for_digest,
+    write_merged_shards,
+)
+from okn_embeddings.indexing.text import text_digest
 from okn_embeddings.indexing.textify import (
     finish_records,
     materialize_records,
@@ -60,7 +78,7 @@ def test_identical_text_groups_with_iri_count():
 def _wr(iri: str, text: str = "same text") -> WorkerRecord:
     # digest only needs to match for records that should group together; here
     # everything shares one digest so they merge into a single OutputRecord.
-    return WorkerRecord(iri=iri, label="L", embedding_text=text, digest="d")
+    return WorkerRecord(iri=iri, label="L", embedding_text=text, digest=b"d")
 
 
 def test_merge_keeps_smallest_n_iris_regardless_of_arrival_order():
@@ -106,6 +124,58 @@ def test_iris_are_capped_but_count_is_total():
     assert record.iri_count == 2
 
 
+def test_shard_records_round_trip(tmp_path):
+    records = [
+        WorkerRecord(
+            iri=f"http://example.org/{i}",
+            label="Café ☕",
+            embedding_text=f"line one\nline {i}: ünïcode",
+            digest=text_digest(f"text {i}"),
+        )
+        for i in range(3)
+    ] + [
+        WorkerRecord(
+            iri="urn:x", label="", embedding_text="", digest=b"\0" * 32
+        )
+    ]
+    path = tmp_path / "shard.bin"
+    path.write_bytes(b"".join(encode_shard_record(r) for r in records))
+
+    assert list(iter_shard_file(path)) == records
+
+
+def test_parallel_shard_merge_matches_a_serial_one(tmp_path):
+    # Shards as two workers would leave them: several texts, some shared by
+    # many IRIs, spread over the shards by digest and over per-pid files.
+    shard_count = 8
+    by_digest: dict = {}
+    for i in range(60):
+        text = f"text {i % 20}"
+        record = WorkerRecord(
+            iri=f"urn:{i}",
+            label="L",
+            embedding_text=text,
+            digest=text_digest(text),
+        )
+        merge_worker_record(by_digest, record, max_iris_per_record=2)
+        shard = shard_for_digest(record.digest, shard_count)
+        with (tmp_path / f"shard-{shard:04d}-{i % 2}.bin").open("ab") as f:
+            f.write(encode_shard_record(record))
+    expected = finish_records(by_digest)
+
+    # spawn: earlier tests leave threads behind, which fork does not copy.
+    with multiprocessing.get_context("spawn").Pool(2) as pool:
+        shards = MaterializedShards(tmp_path, pool, 2, shard_count)
+        merged = list(iter_shard_records(shards, max_iris_per_record=2))
+        out = io.StringIO()
+        count = write_merged_shards(shards, out, max_iris_per_record=2)
+
+    # Shard order, not global text order, but the same grouped records.
+    assert sorted(merged, key=lambda r: r.embedding_text) == expected
+    assert count == len(expected)
+    assert json.loads(out.getvalue()) == [asdict(r) for r in merged]
+
+
 def test_jsonl_output_round_trips_into_an_upload_payload(tmp_path):
     # The whole point of --jsonl: textify writes records that `upload` reads
     # back line by line and turns into the payload the query side expects.
@@ -130,3 +200,57 @@ def test_jsonl_output_round_trips_into_an_upload_payload(tmp_path):
     assert row.label == "Diabetes"
     assert row.repr == records[0].embedding_text
     assert row.iri_count == 2
+
+
+@pytest.mark.parametrize(
+    ("suffix", "magic"),
+    [(".gz", b"\x1f\x8b"), (".zst", b"\x28\xb5\x2f\xfd")],
+)
+def test_compressed_jsonl_output_round_trips(tmp_path, suffix, magic):
+    records = materialize_records(_graph_with_two_identical_things(), _config())
+    out = tmp_path / f"thing.jsonl{suffix}"
+    write_jsonl(records, out)
+
+    # The codec follows the extension, and `upload` reads it back as is.
+    assert out.read_bytes().startswith(magic)
+    read_back = list(iter_jsonl(out))
+    assert [r["embedding_text"] for r in read_back] == [
+        records[0].embedding_text
+    ]
+
+
+def test_index_streams_textify_records_into_qdrant(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    # `index` = `textify --jsonl` + `upload`, with no file in between.
+    config_toml = tmp_path / "config.toml"
+    config_toml.write_text(
+        f'[targets.thing]\ntype = "{TYPE}"\nlabel_predicates = ["{NAME}"]\n'
+        "expansion_limit = 0\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(
+        cli, "load_graph", lambda _: _graph_with_two_identical_things()
+    )
+    monkeypatch.setattr(AppContext, "from_env", staticmethod(lambda: ctx))
+
+    result = CliRunner().invoke(
+        cli.app,
+        [
+            "index",
+            str(tmp_path / "things.hdt"),
+            str(config_toml),
+            "--jobs",
+            "1",
+            "--no-progress",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    points, _ = ctx.client.scroll(
+        ctx.settings.qdrant_collection, limit=10, with_payload=True
+    )
+    assert len(points) == 1
+    payload = points[0].payload or {}
+    assert payload["graph"] == "things"
+    assert payload["iri"] == ["http://example.org/a", "http://example.org/b"]
@@ -1,8 +1,37 @@
+import gc
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
+import pytest
+from qdrant_client.models import PointStruct
 
 from okn_embeddings.config.context import AppContext
-from okn_embeddings.core.models import TextFeature
-from okn_embeddings.core.query import get_embedding
+from okn_embeddings.config.settings import AppSettings
+from okn_embeddings.core.embedding import (
+    BatchingEmbedder,
+    CachedEmbedder,
+    FastEmbedEmbedder,
+    make_query_embedder,
+)
+from okn_embeddings.core.errors import URINotFoundError
+from okn_embeddings.core.models import (
+    NodeFeature,
+    Query,
+    TextFeature,
+    build_feature,
+)
+from okn_embeddings.core.query import (
+    get_embedding,
+    lookup_node,
+    run_similarity_search,
+)
+from okn_embeddings.core.result_cache import ResultCache, collection_version
+from okn_embeddings.indexing.upload import mark_upload_generation
+
+_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
 
 def test_get_embedding_text_routes_through_embedder(ctx: AppContext):
@@ -10,3 +39,327 @@ def test_get_embedding_text_routes_through_embedder(ctx: AppContext):
     out = get_embedding(ctx, TextFeature(type="text", value="diabetes"))
 
     assert np.array_equal(out, ctx.embedder.embed("diabetes"))
+
+
+def test_cached_embedder_reuses_vectors(embedder: FastEmbedEmbedder):
+    cached = CachedEmbedder(embedder, model_name="m", maxsize=8)
+
+    first = cached.embed("diabetes")
+    # Whitespace-only differences normalize to the same key.
+    second = cached.embed("  diabetes \n")
+
+    assert second is first
+    assert np.array_equal(first, embedder.embed("diabetes"))
+    assert cached.stats.hits == 1
+    assert cached.stats.misses == 1
+    assert cached.stats.size == 1
+
+
+def test_cached_embedder_evicts_least_recently_used(
+    embedder: FastEmbedEmbedder,
+):
+    cached = CachedEmbedder(embedder, model_name="m", maxsize=2)
+
+    cached.embed("a")
+    cached.embed("b")
+    cached.embed("a")  # "b" is now least recently used
+    cached.embed("c")
+    cached.embed("a")
+
+    assert cached.stats.size == 2
+    assert cached.stats.hits == 2
+    assert cached.stats.misses == 3
+
+
+def test_make_query_embedder_can_disable_cache():
+    off = AppSettings(model_name=_MODEL, query_cache_size=0)
+    on = AppSettings(model_name=_MODEL, query_cache_size=4)
+
+    assert not isinstance(make_query_embedder(off), CachedEmbedder)
+    assert isinstance(make_query_embedder(on), CachedEmbedder)
+
+
+@pytest.mark.filterwarnings("ignore:This process .* is multi-threaded")
+def test_query_embedder_loaded_before_a_fork_works_in_the_child(
+    embedder: FastEmbedEmbedder,
+):
+    # Preload mode (gunicorn.conf.py): the master loads and warms the model,
+    # freezes the heap and forks; each worker then embeds with the inherited
+    # session. The batcher's thread, started here, does not survive the fork.
+    settings = AppSettings(model_name=_MODEL, embed_batch_wait_ms=1)
+    shared = make_query_embedder(settings)
+    shared.embed_many(["warm up"])
+    shared.embed("started in the parent")
+    expected = embedder.embed("embedded in the child")
+
+    parent_end, child_end = multiprocessing.Pipe()
+
+    def child() -> None:
+        child_end.send(shared.embed("embedded in the child"))
+
+    gc.freeze()
+    try:
+        worker = multiprocessing.get_context("fork").Process(target=child)
+        worker.start()
+    finally:
+        gc.unfreeze()
+    try:
+        # A session that deadlocks after the fork fails here, not hangs.
+        assert parent_end.poll(timeout=30), "the forked child never embedded"
+        assert np.allclose(parent_end.recv(), expected)
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+    finally:
+        if worker.is_alive():
+            worker.kill()
+
+
+class _RecordingEmbedder:
+    # Wraps the real embedder, remembering the size of each batch it ran.
+    def __init__(self, inner: FastEmbedEmbedder):
+        self.inner = inner
+        self.batches: list[int] = []
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: list[str]) -> list[np.ndarray]:
+        self.batches.append(len(texts))
+        return self.inner.embed_many(texts)
+
+
+def test_batching_embedder_coalesces_concurrent_calls(
+    embedder: FastEmbedEmbedder,
+):
+    inner = _RecordingEmbedder(embedder)
+    batching = BatchingEmbedder(inner, max_batch_size=4, max_wait=0.2)
+    texts = [f"text {i}" for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        vectors = list(pool.map(batching.embed, texts))
+
+    # Every caller gets the vector for its own text...
+    for text, vector in zip(texts, vectors, strict=True):
+        assert np.array_equal(vector, embedder.embed(text))
+    # ...from fewer, larger batches, none above the cap.
+    assert sum(inner.batches) == 8
+    assert len(inner.batches) < 8
+    assert max(inner.batches) <= 4
+
+
+def test_batching_embedder_propagates_errors():
+    class Broken:
+        def embed(self, text: str) -> np.ndarray:
+            raise NotImplementedError
+
+        def embed_many(self, texts: list[str]) -> list[np.ndarray]:
+            raise RuntimeError("model failed")
+
+    batching = BatchingEmbedder(Broken(), max_wait=0)
+
+    with pytest.raises(RuntimeError, match="model failed"):
+        batching.embed("x")
+
+
+def test_batching_embedder_survives_a_short_batch():
+    class Short:
+        def embed(self, text: str) -> np.ndarray:
+            raise NotImplementedError
+
+        def embed_many(self, texts: list[str]) -> list[np.ndarray]:
+            return []
+
+    batching = BatchingEmbedder(Short(), max_wait=0)
+
+    errors = []
+
+    def call_twice():
+        for _ in range(2):
+            try:
+                batching.embed("x")
+            except ValueError as e:
+                errors.append(e)
+
+    # The worker thread must outlive the bad batch, or the second call hangs.
+    caller = threading.Thread(target=call_twice, daemon=True)
+    caller.start()
+    caller.join(timeout=5)
+
+    assert not caller.is_alive()
+    assert len(errors) == 2
+
+
+# --- node features against in-memory Qdrant ---
+
+
+def _seed_nodes(ctx: AppContext, texts: list[str]) -> list[str]:
+    # One point per text, with IRI urn:<i>. Returns the point ids.
+    ids = [str(uuid.uuid5(uuid.NAMESPACE_URL, text)) for text in texts]
+    ctx.client.upsert(
+        ctx.settings.qdrant_collection,
+        points=[
+            PointStruct(
+                id=pid,
+                vector=ctx.embedder.embed(text).tolist(),
+                payload={"iri": [f"urn:{i}"], "graph": "g"},
+            )
+            for i, (pid, text) in enumerate(zip(ids, texts, strict=True))
+        ],
+    )
+    return ids
+
+
+def test_node_lookup_is_cached(ctx: AppContext):
+    ids = _seed_nodes(ctx, ["diabetes", "insulin"])
+    feature = NodeFeature(type="node", value="urn:1")
+
+    first = get_embedding(ctx, feature)
+    ctx.client.delete(ctx.settings.qdrant_collection, points_selector=ids)
+
+    # Served from the cache, though the point is gone from the collection.
+    assert np.array_equal(get_embedding(ctx, feature), first)
+    assert lookup_node(ctx, "urn:1").id == ids[1]
+
+
+def test_unknown_node_raises(ctx: AppContext):
+    with pytest.raises(URINotFoundError):
+        get_embedding(ctx, NodeFeature(type="node", value="urn:missing"))
+
+
+def test_node_search_by_point_id_skips_the_source_point(ctx: AppContext):
+    ids = _seed_nodes(ctx, ["diabetes", "insulin", "weather"])
+
+    by_iri = run_similarity_search(
+        ctx, Query(feature=build_feature("node", "urn:0"), limit=3)
+    )
+    by_id = run_similarity_search(
+        ctx,
+        Query(
+            feature=build_feature("node", "urn:0", point_id=ids[0]),
+            limit=3,
+        ),
+    )
+
+    # Same ranking, minus the node itself, which Qdrant leaves out when
+    # querying by point id.
+    assert [str(p.id) for p in by_iri.points][1:] == [
+        str(p.id) for p in by_id.points
+    ]
+    assert str(by_iri.points[0].id) == ids[0]
+
+
+def test_build_feature_drops_point_id_for_text():
+    assert isinstance(build_feature("text", "x", point_id="5"), TextFeature)
+    assert build_feature("node", "x", point_id="5").point_id == 5
+
+
+def test_query_embedder_loads_model_on_first_embed(
+    embedder: FastEmbedEmbedder, monkeypatch
+):
+    built = []
+
+    def make(settings):
+        built.append(settings.model_name)
+        return embedder
+
+    monkeypatch.setattr("okn_embeddings.core.embedding.make_embedder", make)
+    query_embedder = make_query_embedder(AppSettings(model_name=_MODEL))
+
+    assert built == []
+    query_embedder.embed("diabetes")
+    query_embedder.embed("insulin")
+    assert built == [_MODEL]
+
+
+# --- whole-response cache ---
+
+
+def test_result_cache_hit_skips_embedding_and_qdrant(
+    ctx: AppContext, monkeypatch
+):
+    _seed_nodes(ctx, ["diabetes", "insulin"])
+    ctx.result_cache = ResultCache(maxsize_bytes=1 << 20, ttl=60)
+    query = Query(feature=build_feature("text", "diabetes"), limit=1)
+
+    first = run_similarity_search(ctx, query)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should have been served from the cache")
+
+    monkeypatch.setattr(ctx.embedder, "embed", fail)
+    monkeypatch.setattr(ctx.client, "query_points", fail)
+    # Surrounding whitespace does not change the key.
+    again = run_similarity_search(
+        ctx, Query(feature=build_feature("text", " diabetes "), limit=1)
+    )
+
+    assert again is first
+    assert ctx.result_cache.stats.hits == 1
+
+
+def test_result_cache_is_invalidated_by_an_upload(ctx: AppContext):
+    _seed_nodes(ctx, ["diabetes"])
+    ctx.result_cache = ResultCache(maxsize_bytes=1 << 20, ttl=60)
+    query = Query(feature=build_feature("text", "diabetes"))
+
+    run_similarity_search(ctx, query)
+    mark_upload_generation(ctx)
+    collection_version.cache_clear()  # skip the short version TTL
+    run_similarity_search(ctx, query)
+
+    assert ctx.result_cache.stats.hits == 0
+    assert ctx.result_cache.stats.misses == 2
+
+
+def _spy_fetches(ctx: AppContext, monkeypatch) -> list[tuple[int, int]]:
+    """Record the (offset, limit) of each search sent to Qdrant."""
+    fetched: list[tuple[int, int]] = []
+    query_points = ctx.client.query_points
+
+    def spy(*args, **kwargs):
+        fetched.append((kwargs["offset"], kwargs["limit"]))
+        return query_points(*args, **kwargs)
+
+    monkeypatch.setattr(ctx.client, "query_points", spy)
+    return fetched
+
+
+def test_deep_pages_are_sliced_from_one_cached_ranking(
+    ctx: AppContext, monkeypatch
+):
+    _seed_nodes(ctx, [f"term {i}" for i in range(10)])
+    ctx.result_cache = ResultCache(maxsize_bytes=1 << 20, ttl=60)
+    ctx.settings.page_window = 4
+    feature = build_feature("text", "term")
+    full = run_similarity_search(ctx, Query(feature=feature, limit=10))
+    fetched = _spy_fetches(ctx, monkeypatch)
+
+    def page(offset: int, limit: int) -> list:
+        query = Query(feature=feature, offset=offset, limit=limit)
+        return [p.id for p in run_similarity_search(ctx, query).points]
+
+    # Two windows cover the first page; the next is a hit on the same list.
+    assert page(2, 3) == [p.id for p in full.points[2:5]]
+    assert page(5, 3) == [p.id for p in full.points[5:8]]
+    assert fetched == [(0, 8)]
+    # Deeper, only the next window is fetched; it comes back short, so the
+    # ranking is known to end there and is not fetched again.
+    assert page(8, 2) == [p.id for p in full.points[8:10]]
+    assert page(9, 3) == [p.id for p in full.points[9:10]]
+    assert fetched == [(0, 8), (8, 4)]
+
+
+def test_deep_pages_are_fetched_as_is_without_the_result_cache(
+    ctx: AppContext, monkeypatch
+):
+    _seed_nodes(ctx, [f"term {i}" for i in range(12)])
+    ctx.result_cache = None
+    ctx.settings.page_window = 4
+    feature = build_feature("text", "term")
+    full = run_similarity_search(ctx, Query(feature=feature, limit=12))
+    fetched = _spy_fetches(ctx, monkeypatch)
+
+    page = run_similarity_search(ctx, Query(feature=feature, offset=5, limit=2))
+
+    assert [p.id for p in page.points] == [p.id for p in full.points[5:7]]
+    assert fetched == [(5, 2)]
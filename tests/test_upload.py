@@ -1,26 +1,59 @@
 import json
+import threading
 
 import numpy as np
 import pytest
-from qdrant_client.models import ScoredPoint
+from qdrant_client.models import (
+    CollectionStatus,
+    OptimizersStatusOneOf1,
+    ScoredPoint,
+)
 
 from okn_embeddings.config.context import AppContext
 from okn_embeddings.config.settings import AppSettings
 from okn_embeddings.core.embedding import FastEmbedEmbedder, make_embedder
+from okn_embeddings.core.query import lookup_node
 from okn_embeddings.core.results import summarize_point
+from okn_embeddings.indexing.adaptive import (
+    AdaptiveBatching,
+    BatchSizeController,
+)
+from okn_embeddings.indexing.checkpoint import (
+    UploadCheckpoint,
+    checkpoint_path,
+    fingerprint,
+    load_checkpoint,
+    save_checkpoint,
+)
+from okn_embeddings.indexing.compression import (
+    graph_name,
+    open_binary_reader,
+    open_text_writer,
+)
+from okn_embeddings.indexing.text import text_digest
 from okn_embeddings.indexing.upload import (
+    BULK_LOAD_KEY,
+    DEFAULT_INDEXING_THRESHOLD,
+    begin_bulk_load,
     chunks,
+    embed_file,
+    end_bulk_load,
     iter_jsonl,
     payload_for_record,
     point_id,
+    prefetch,
     upload_file,
+    upload_files,
+    upload_stream,
 )
+from okn_embeddings.indexing.vector_cache import VectorCache
+from okn_embeddings.indexing.vectors import vectors_path
 
 _MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
 
 def _write_records(path, n: int) -> None:
-    with path.open("w", encoding="utf-8") as f:
+    with open_text_writer(path) as f:
         for i in range(n):
             f.write(
                 json.dumps(
@@ -107,6 +140,13 @@ def test_iter_jsonl_reports_line_numbers(tmp_path):
         list(iter_jsonl(path))
 
 
+def test_iter_jsonl_rejects_invalid_utf8(tmp_path):
+    path = tmp_path / "g.jsonl"
+    path.write_bytes(b'{"a": 1}\n{"a": "\xff"}\n')
+    with pytest.raises(ValueError, match=r"g\.jsonl:2: invalid JSON"):
+        list(iter_jsonl(path))
+
+
 def test_iter_jsonl_skips_blank_lines(tmp_path):
     path = tmp_path / "g.jsonl"
     path.write_text('{"a": 1}\n\n{"a": 2}\n', encoding="utf-8")
@@ -118,6 +158,40 @@ def test_chunks_batches_with_remainder():
     assert [len(b) for b in batches] == [2, 2, 1]
 
 
+# --- prefetch: the reader stage of the upload pipeline ---
+
+
+def test_prefetch_preserves_order():
+    assert list(prefetch(iter(range(10)), depth=2)) == list(range(10))
+
+
+def test_prefetch_reraises_producer_errors():
+    def items():
+        yield 1
+        raise ValueError("bad line")
+
+    it = prefetch(items(), depth=2)
+    assert next(it) == 1
+    with pytest.raises(ValueError, match="bad line"):
+        next(it)
+
+
+def test_prefetch_stops_producer_when_consumer_stops():
+    produced = []
+
+    def items():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    it = prefetch(items(), depth=2)
+    assert next(it) == 0
+    it.close()
+
+    # Bounded by the queue depth, not the length of the input.
+    assert len(produced) < 10
+
+
 # --- upload_file against in-memory Qdrant (the shared `ctx` fixture) ---
 
 
@@ -205,6 +279,598 @@ def test_reupload_is_idempotent(ctx: AppContext, tmp_path):
     assert ctx.client.count(ctx.settings.qdrant_collection).count == 5
 
 
+def test_upload_file_surfaces_upsert_errors(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 10)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("qdrant is down")
+
+    monkeypatch.setattr(ctx.client, "upsert", fail)
+    with pytest.raises(RuntimeError, match="qdrant is down"):
+        upload_file(
+            ctx,
+            path,
+            batch_size=2,
+            upload_batch_size=2,
+            limit=None,
+            dry_run=False,
+            progress_enabled=False,
+            log_every=10_000,
+            upload_workers=3,
+        )
+
+
+def _upload(ctx: AppContext, path, **kwargs) -> int:
+    options = dict(
+        batch_size=2,
+        upload_batch_size=2,
+        limit=None,
+        dry_run=False,
+        progress_enabled=False,
+        log_every=10_000,
+    )
+    return upload_file(ctx, path, **(options | kwargs))
+
+
+def _fail_third_upsert(ctx: AppContext, monkeypatch) -> None:
+    upsert = ctx.client.upsert
+    calls = 0
+
+    def flaky(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            raise RuntimeError("connection reset")
+        return upsert(*args, **kwargs)
+
+    monkeypatch.setattr(ctx.client, "upsert", flaky)
+
+
+def test_resume_continues_after_the_last_acknowledged_upsert(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 10)
+    _fail_third_upsert(ctx, monkeypatch)
+
+    with pytest.raises(RuntimeError):
+        _upload(ctx, path, resume=True)
+    saved = load_checkpoint(checkpoint_path(path), fingerprint(ctx, path))
+    assert saved is not None and saved.records == 4
+
+    embedded: list[str] = []
+    embed_many = ctx.embedder.embed_many
+
+    def spy(texts):
+        embedded.extend(texts)
+        return embed_many(texts)
+
+    monkeypatch.setattr(ctx.embedder, "embed_many", spy)
+    assert _upload(ctx, path, resume=True) == 10
+
+    assert embedded == [f"text {i}" for i in range(4, 10)]
+    assert ctx.client.count(ctx.settings.qdrant_collection).count == 10
+    assert not checkpoint_path(path).exists()
+
+
+def test_upload_without_resume_writes_no_checkpoint(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 10)
+    _fail_third_upsert(ctx, monkeypatch)
+
+    with pytest.raises(RuntimeError):
+        _upload(ctx, path)
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_checkpoint_dir_keeps_checkpoints_away_from_the_input(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    path = tmp_path / "data" / "g.jsonl"
+    path.parent.mkdir()
+    _write_records(path, 10)
+    checkpoints = tmp_path / "state"
+    _fail_third_upsert(ctx, monkeypatch)
+
+    with pytest.raises(RuntimeError):
+        _upload(ctx, path, checkpoint_dir=checkpoints)
+    assert list(path.parent.iterdir()) == [path]
+    saved = load_checkpoint(
+        checkpoint_path(path, checkpoints), fingerprint(ctx, path)
+    )
+    assert saved is not None and saved.records == 4
+
+
+def test_resume_ignores_a_checkpoint_for_another_file(
+    ctx: AppContext, tmp_path
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 4)
+    save_checkpoint(
+        checkpoint_path(path),
+        UploadCheckpoint("stale", offset=10, line=1, records=1),
+    )
+
+    assert _upload(ctx, path, resume=True) == 4
+    assert ctx.client.count(ctx.settings.qdrant_collection).count == 4
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".zst"])
+def test_upload_file_reads_compressed_input(ctx: AppContext, tmp_path, suffix):
+    path = tmp_path / f"my-graph.jsonl{suffix}"
+    _write_records(path, 5)
+
+    assert graph_name(path) == "my-graph"
+    assert _upload(ctx, path) == 5
+    points, _ = ctx.client.scroll(
+        ctx.settings.qdrant_collection, limit=10, with_payload=True
+    )
+    assert {(p.payload or {})["graph"] for p in points} == {"my-graph"}
+
+
+@pytest.mark.parametrize("suffix", ["", ".gz", ".zst"])
+def test_binary_reader_offsets_count_decompressed_bytes(tmp_path, suffix):
+    # What a checkpoint's offset means for every codec, so resume lands on the
+    # same record whether or not the input is compressed.
+    path = tmp_path / f"g.jsonl{suffix}"
+    _write_records(path, 3)
+    with open_binary_reader(path) as f:
+        first = f.readline()
+    with open_binary_reader(path, len(first)) as f:
+        assert json.loads(f.readline())["label"] == "L1"
+
+
+def test_incremental_embeds_only_changed_records_and_drops_stale(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 6)
+    _upload(ctx, path)
+
+    # Next release: record 0 changed text, record 5 is gone.
+    lines = path.read_text(encoding="utf-8").splitlines()[:5]
+    lines[0] = lines[0].replace('"text 0"', '"text 0, revised"')
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    embedded: list[str] = []
+    embed_many = ctx.embedder.embed_many
+
+    def spy(texts):
+        embedded.extend(texts)
+        return embed_many(texts)
+
+    monkeypatch.setattr(ctx.embedder, "embed_many", spy)
+    assert _upload(ctx, path, incremental=True) == 1
+
+    assert embedded == ["text 0, revised"]
+    points, _ = ctx.client.scroll(
+        ctx.settings.qdrant_collection, limit=10, with_payload=True
+    )
+    assert sorted((p.payload or {})["repr"] for p in points) == [
+        "text 0, revised",
+        "text 1",
+        "text 2",
+        "text 3",
+        "text 4",
+    ]
+
+
+def test_incremental_updates_records_whose_payload_changed(
+    ctx: AppContext, tmp_path
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 2)
+    _upload(ctx, path)
+
+    # Same first IRI and text, so the same point id, but a new IRI.
+    lines = path.read_text(encoding="utf-8").splitlines()
+    lines[0] = lines[0].replace('["urn:0"]', '["urn:0", "urn:extra"]')
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    assert _upload(ctx, path, incremental=True) == 1
+    assert lookup_node(ctx, "urn:extra").id == lookup_node(ctx, "urn:0").id
+    assert ctx.client.count(ctx.settings.qdrant_collection).count == 2
+
+
+def _upload_all(ctx: AppContext, paths, **kwargs) -> int:
+    options = dict(
+        batch_size=2,
+        upload_batch_size=2,
+        limit=None,
+        create_collection=False,
+        payload_indexes=False,
+        dry_run=False,
+        progress_enabled=False,
+        log_every=10_000,
+    )
+    return upload_files(ctx, paths, **(options | kwargs))
+
+
+def _stream(ctx: AppContext, graph, records, **kwargs) -> int:
+    options = dict(
+        batch_size=2,
+        upload_batch_size=2,
+        create_collection=False,
+        payload_indexes=False,
+        dry_run=False,
+        progress_enabled=False,
+        log_every=10_000,
+    )
+    return upload_stream(ctx, graph, records, **(options | kwargs))
+
+
+def test_upload_stream_writes_the_points_a_file_upload_would(
+    ctx: AppContext, tmp_path
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 5)
+    records = list(iter_jsonl(path))
+
+    assert _stream(ctx, "g", iter(records)) == 5
+    # Same ids, payloads and vectors: re-uploading the file finds nothing new.
+    assert _upload(ctx, path, incremental=True) == 0
+    assert ctx.client.count(ctx.settings.qdrant_collection).count == 5
+
+
+def test_partial_upload_stream_keeps_unseen_points(ctx: AppContext, tmp_path):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 5)
+    records = list(iter_jsonl(path))
+    _stream(ctx, "g", records)
+
+    assert _stream(ctx, "g", records[:2], incremental=True, complete=False) == 0
+    assert ctx.client.count(ctx.settings.qdrant_collection).count == 5
+    _stream(ctx, "g", records[:2], incremental=True)
+    assert ctx.client.count(ctx.settings.qdrant_collection).count == 2
+
+
+def test_upload_files_with_jobs_uploads_every_graph(ctx: AppContext, tmp_path):
+    paths = [tmp_path / f"graph-{i}.jsonl" for i in range(3)]
+    for i, path in enumerate(paths):
+        _write_records(path, 3 + i)
+
+    assert _upload_all(ctx, paths, jobs=3) == 3 + 4 + 5
+
+    points, _ = ctx.client.scroll(
+        ctx.settings.qdrant_collection, limit=20, with_payload=True
+    )
+    graphs = sorted((p.payload or {})["graph"] for p in points)
+    assert graphs == ["graph-0"] * 3 + ["graph-1"] * 4 + ["graph-2"] * 5
+
+
+def test_upload_files_with_jobs_stops_every_file_on_error(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    paths = [tmp_path / f"graph-{i}.jsonl" for i in range(2)]
+    for path in paths:
+        _write_records(path, 50)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("qdrant is down")
+
+    monkeypatch.setattr(ctx.client, "upsert", fail)
+    with pytest.raises(RuntimeError, match="qdrant is down"):
+        _upload_all(ctx, paths, jobs=2)
+
+
+def test_unconfirmed_upserts_are_bounded_and_end_with_a_barrier(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 10)
+    upsert = ctx.client.upsert
+    waits: list[bool] = []
+
+    def spy(*args, wait=True, **kwargs):
+        waits.append(wait)
+        return upsert(*args, wait=wait, **kwargs)
+
+    monkeypatch.setattr(ctx.client, "upsert", spy)
+    assert _upload(ctx, path, max_unconfirmed=2) == 10
+
+    # Five batches: every third waits, then the last is re-sent to wait on.
+    assert waits == [False, False, True, False, False, True]
+    assert ctx.client.count(ctx.settings.qdrant_collection).count == 10
+
+
+def test_concurrent_unconfirmed_upserts_always_end_with_a_barrier(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 6)
+    upsert = ctx.client.upsert
+    waits: list[bool] = []
+    lock = threading.Lock()
+
+    def spy(*args, wait=True, **kwargs):
+        with lock:
+            waits.append(wait)
+        return upsert(*args, wait=wait, **kwargs)
+
+    monkeypatch.setattr(ctx.client, "upsert", spy)
+    assert _upload(ctx, path, max_unconfirmed=2, upload_workers=3) == 6
+
+    # The last batch scheduled waits, but it may have overtaken the two that
+    # did not, so a barrier still follows once all three are acknowledged.
+    assert sorted(waits[:3]) == [False, False, True]
+    assert waits[3:] == [True]
+    assert ctx.client.count(ctx.settings.qdrant_collection).count == 6
+
+
+def _index_updates(ctx: AppContext, monkeypatch) -> list[tuple]:
+    """Spy on the (m, indexing_threshold) each index update sets."""
+    update = ctx.client.update_collection
+    updates: list[tuple] = []
+
+    def spy(*args, hnsw_config=None, optimizers_config=None, **kwargs):
+        if hnsw_config is not None or optimizers_config is not None:
+            updates.append(
+                (
+                    hnsw_config and hnsw_config.m,
+                    optimizers_config and optimizers_config.indexing_threshold,
+                )
+            )
+        return update(
+            *args,
+            hnsw_config=hnsw_config,
+            optimizers_config=optimizers_config,
+            **kwargs,
+        )
+
+    monkeypatch.setattr(ctx.client, "update_collection", spy)
+    return updates
+
+
+def test_bulk_load_defers_indexing_and_restores_it(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 4)
+    config = ctx.client.get_collection(ctx.settings.qdrant_collection).config
+    updates = _index_updates(ctx, monkeypatch)
+
+    assert _upload_all(ctx, [path], bulk_load=True) == 4
+
+    original = (
+        config.hnsw_config.m,
+        config.optimizer_config.indexing_threshold,
+    )
+    assert updates == [(0, 0), original]
+    info = ctx.client.get_collection(ctx.settings.qdrant_collection)
+    assert (info.config.metadata or {}).get(BULK_LOAD_KEY) is None
+
+
+def test_bulk_load_restores_a_default_indexing_threshold(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    # A collection that leaves the threshold unset must not be "restored"
+    # to unset, which would leave it at 0 and never index.
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 4)
+    get_collection = ctx.client.get_collection
+
+    def unset_threshold(*args, **kwargs):
+        info = get_collection(*args, **kwargs)
+        info.config.optimizer_config.indexing_threshold = None
+        return info
+
+    monkeypatch.setattr(ctx.client, "get_collection", unset_threshold)
+    updates = _index_updates(ctx, monkeypatch)
+
+    _upload_all(ctx, [path], bulk_load=True)
+
+    assert updates[-1][1] == DEFAULT_INDEXING_THRESHOLD
+
+
+def _collection_status(ctx: AppContext, monkeypatch, status, error=None):
+    get_collection = ctx.client.get_collection
+
+    def with_status(*args, **kwargs):
+        info = get_collection(*args, **kwargs)
+        info.status = status
+        if error is not None:
+            info.optimizer_status = OptimizersStatusOneOf1(error=error)
+        return info
+
+    monkeypatch.setattr(ctx.client, "get_collection", with_status)
+
+
+def test_end_bulk_load_raises_when_indexing_fails(ctx: AppContext, monkeypatch):
+    restore = begin_bulk_load(ctx)
+    _collection_status(ctx, monkeypatch, CollectionStatus.RED, "disk full")
+
+    with pytest.raises(RuntimeError, match="disk full"):
+        end_bulk_load(ctx, restore)
+
+
+def test_end_bulk_load_gives_up_waiting_after_its_timeout(
+    ctx: AppContext, monkeypatch
+):
+    restore = begin_bulk_load(ctx)
+    _collection_status(ctx, monkeypatch, CollectionStatus.YELLOW)
+    monkeypatch.setattr(
+        "okn_embeddings.indexing.upload.OPTIMIZE_POLL_SECONDS", 0.0
+    )
+
+    with pytest.raises(TimeoutError, match="still indexing"):
+        end_bulk_load(ctx, restore, timeout=0.05)
+    # The settings were restored before waiting.
+    config = ctx.client.get_collection(ctx.settings.qdrant_collection).config
+    assert config.hnsw_config.m == restore["m"]
+
+
+def test_failed_bulk_load_still_restores_indexing(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 4)
+    updates = _index_updates(ctx, monkeypatch)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("qdrant is down")
+
+    monkeypatch.setattr(ctx.client, "upsert", fail)
+    with pytest.raises(RuntimeError):
+        _upload_all(ctx, [path], bulk_load=True)
+
+    assert updates[0] == (0, 0)
+    assert updates[-1][0] != 0 and updates[-1][1] != 0
+
+
+# --- adaptive batch sizes ---
+
+
+def test_batch_size_controller_steers_towards_the_budget():
+    config = AdaptiveBatching(min_size=8, max_size=1000, target_seconds=1.0)
+    controller = BatchSizeController(100, config)
+
+    # 100 items in 0.25 s: 400 would take the full second.
+    for _ in range(10):
+        controller.observe(controller.size, controller.size / 400)
+    assert 390 <= controller.size <= 400
+
+    # Much slower now; shrinks, but never below the floor.
+    for _ in range(20):
+        controller.observe(controller.size, controller.size)
+    assert controller.size == 8
+
+
+def test_batch_size_controller_without_config_is_fixed():
+    controller = BatchSizeController(256)
+    controller.observe(256, 100.0)
+    assert controller.size == 256
+
+
+def test_adaptive_upload_uploads_everything(ctx: AppContext, tmp_path):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 40)
+
+    uploaded = _upload(
+        ctx,
+        path,
+        adaptive=AdaptiveBatching(min_size=1, max_size=16, target_seconds=1e-4),
+    )
+
+    assert uploaded == 40
+    assert ctx.client.count(ctx.settings.qdrant_collection).count == 40
+
+
+# --- on-disk vector cache ---
+
+
+def test_vector_cache_persists_and_drops_a_torn_tail(tmp_path):
+    cache = VectorCache(tmp_path, _MODEL)
+    keys = [text_digest("a"), text_digest("b")]
+    cache.put_many(keys, [np.ones(4), np.full(4, 2.0)])
+    # Simulate a run killed halfway through appending a row.
+    with (cache.directory / "vectors.f32").open("ab") as f:
+        f.write(b"\0" * 6)
+
+    reopened = VectorCache(tmp_path, _MODEL)
+
+    assert len(reopened) == 2
+    a, b, c = reopened.get_many(keys + [text_digest("c")])
+    assert np.array_equal(b, np.full(4, 2.0, dtype=np.float32))
+    assert c is None
+    reopened.put_many([text_digest("c")], [np.zeros(4)])
+    assert np.array_equal(reopened.get_many([text_digest("a")])[0], a)
+
+
+def test_vector_caches_sharing_a_directory_see_each_others_rows(tmp_path):
+    # Two uploads with one --vector-cache: each opened the store before the
+    # other wrote to it, so neither may number rows from what it has seen.
+    a = VectorCache(tmp_path, _MODEL)
+    b = VectorCache(tmp_path, _MODEL)
+    x, y = text_digest("x"), text_digest("y")
+    a.put_many([x], [np.ones(4)])
+    b.put_many([y], [np.full(4, 2.0)])
+
+    for cache in (a, b, VectorCache(tmp_path, _MODEL)):
+        got_x, got_y = cache.get_many([x, y])
+        assert np.array_equal(got_x, np.ones(4, dtype=np.float32))
+        assert np.array_equal(got_y, np.full(4, 2.0, dtype=np.float32))
+    directory = a.directory
+    assert (directory / "vectors.f32").stat().st_size == 2 * 4 * 4
+    assert (directory / "digests.bin").stat().st_size == 2 * 32
+
+
+def test_upload_with_vector_cache_skips_inference_on_rebuild(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 5)
+    cache = tmp_path / "vectors"
+    _upload_all(ctx, [path], vector_cache=cache)
+    first, _ = ctx.client.scroll(
+        ctx.settings.qdrant_collection, limit=10, with_vectors=True
+    )
+
+    def fail(texts):
+        raise AssertionError("should have been served from the cache")
+
+    monkeypatch.setattr(ctx.embedder, "embed_many", fail)
+    assert _upload_all(ctx, [path], vector_cache=cache) == 5
+
+    again, _ = ctx.client.scroll(
+        ctx.settings.qdrant_collection, limit=10, with_vectors=True
+    )
+    # Same inputs; the local client's cosine normalization may differ in ulp.
+    assert np.allclose(
+        [p.vector for p in again], [p.vector for p in first], atol=1e-6
+    )
+
+
+# --- vector sidecars: embed ahead, upload without the model ---
+
+
+def _embed(ctx: AppContext, path) -> int:
+    return embed_file(
+        ctx.embedder,
+        path,
+        vectors_path(path),
+        batch_size=2,
+        model_name=ctx.settings.model_name,
+        progress_enabled=False,
+    )
+
+
+def test_upload_from_vector_sidecar_does_not_embed(
+    ctx: AppContext, tmp_path, monkeypatch
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 5)
+    assert _embed(ctx, path) == 5
+    expected = ctx.embedder.embed("text 3")
+
+    def fail(texts):
+        raise AssertionError("should have read the sidecar")
+
+    monkeypatch.setattr(ctx.embedder, "embed_many", fail)
+    assert _upload(ctx, path, vectors=True) == 5
+
+    hits = ctx.client.query_points(
+        ctx.settings.qdrant_collection, query=expected.tolist(), limit=1
+    ).points
+    assert (hits[0].payload or {})["repr"] == "text 3"
+
+
+def test_upload_rejects_a_sidecar_from_another_version_of_the_file(
+    ctx: AppContext, tmp_path
+):
+    path = tmp_path / "g.jsonl"
+    _write_records(path, 5)
+    _embed(ctx, path)
+    _write_records(path, 6)
+
+    with pytest.raises(ValueError, match="changed since"):
+        _upload(ctx, path, vectors=True)
+
+
 # --- seam: single embed agrees with batch embed_many ---
 
 